@@ -0,0 +1,84 @@
+"""indexes for order, meal and refresh token lookups
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_orders_created_at_id",
+            "orders",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_orders_unassigned_created_at_id",
+            "orders",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_where=sa.text("staff_id IS NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_orders_staff_id",
+            "orders",
+            ["staff_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_order_meal_order_id",
+            "order_meal",
+            ["order_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_meals_is_available_id",
+            "meals",
+            ["is_available", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_users_refresh_token",
+            "users",
+            ["refresh_token"],
+            postgresql_where=sa.text("refresh_token IS NOT NULL"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index_name, table_name in (
+            ("ix_users_refresh_token", "users"),
+            ("ix_meals_is_available_id", "meals"),
+            ("ix_order_meal_order_id", "order_meal"),
+            ("ix_orders_staff_id", "orders"),
+            ("ix_orders_unassigned_created_at_id", "orders"),
+            ("ix_orders_created_at_id", "orders"),
+        ):
+            op.drop_index(
+                index_name,
+                table_name=table_name,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
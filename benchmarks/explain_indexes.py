@@ -0,0 +1,79 @@
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.sql import Select
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.config.variables import DATABASE_URL  # noqa: E402
+from src.infrastructure.repository_impl.meal_repository_impl import meal_list_query  # noqa: E402
+from src.infrastructure.repository_impl.order_repository_impl import order_list_query, order_meals_query  # noqa: E402
+from src.infrastructure.repository_impl.user_repository_impl import refresh_token_query  # noqa: E402
+
+INDEX_SCAN_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+# the statements the repositories run, built by the same functions, each paired with the index migration 0002 added for it;
+# ix_orders_staff_id backs the users foreign key and no repository query filters on it
+CASES: List[Tuple[str, Select[Any]]] = [
+    ("ix_orders_created_at_id", order_list_query(page=1, size=20, is_order_responsible=None)),
+    (
+        "ix_orders_created_at_id",
+        order_list_query(
+            page=1, size=20, is_order_responsible=None, after_created_at=datetime(2100, 1, 1), after_id=1_000_000
+        ),
+    ),
+    ("ix_orders_unassigned_created_at_id", order_list_query(page=1, size=20, is_order_responsible=True)),
+    (
+        "ix_orders_unassigned_created_at_id",
+        order_list_query(
+            page=1, size=20, is_order_responsible=True, after_created_at=datetime(2100, 1, 1), after_id=1_000_000
+        ),
+    ),
+    ("ix_order_meal_order_id", order_meals_query(order_id=1)),
+    ("ix_meals_is_available_id", meal_list_query(page=1, size=20, is_available=True)),
+    ("ix_meals_is_available_id", meal_list_query(page=1, size=20, is_available=True, after_id=0)),
+    ("ix_users_refresh_token", refresh_token_query(refresh_token="refresh-token")),
+]
+
+def plan_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+async def main() -> int:
+    engine = create_async_engine(DATABASE_URL)
+    failures = 0
+    try:
+        async with engine.connect() as connection:
+            # small or empty tables are always cheaper to seq scan, so rule that out
+            # and check that each query can be answered by its index at all
+            await connection.execute(text("SET enable_seqscan = off"))
+            for index_name, statement in CASES:
+                sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+                result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+                plan = result.scalar_one()
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                used = [
+                    node["Node Type"]
+                    for node in plan_nodes(plan[0]["Plan"])
+                    if node.get("Index Name") == index_name and node["Node Type"] in INDEX_SCAN_NODES
+                ]
+                if used:
+                    print(f"ok    {index_name}: {used[0]}")
+                else:
+                    failures += 1
+                    print(f"FAIL  {index_name} is not used:\n{json.dumps(plan, indent=2)}")
+    finally:
+        await engine.dispose()
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,108 @@
+import argparse
+import multiprocessing
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.infrastructure.config.variables import (  # noqa: E402
+    IMAGE_QUALITY,
+    IMAGE_VARIANT_FORMATS,
+    IMAGE_VARIANT_SIZES,
+    TARGET_IMAGE_SIZE,
+)
+from src.infrastructure.utils.image_processing import process_and_save_image  # noqa: E402
+
+# synthetic corpus matching common phone camera resolutions (12, 24 and 48 MP)
+SYNTHETIC_SIZES = [(4032, 3024), (6000, 4000), (8000, 6000)]
+
+def baseline_process(image_path: Path, output_dir: Path, stem: str) -> None:
+    # the previous pipeline: full decode, crop, lanczos resize, two-pass jpeg encode
+    with Image.open(image_path) as image:
+        image = image.convert("RGB")
+        width, height = image.size
+        short_side = min(width, height)
+        left = (width - short_side) / 2
+        top = (height - short_side) / 2
+        img_cropped = image.crop((left, top, left + short_side, top + short_side))
+        img_resized = img_cropped.resize((TARGET_IMAGE_SIZE, TARGET_IMAGE_SIZE), Image.Resampling.LANCZOS)
+        img_resized.save(output_dir / f"{stem}.jpg", format="JPEG", quality=IMAGE_QUALITY, optimize=True, progressive=True)
+
+def fast_process(image_path: Path, output_dir: Path, stem: str) -> None:
+    process_and_save_image(image_path, output_dir, stem, TARGET_IMAGE_SIZE, [TARGET_IMAGE_SIZE], ["jpeg"], IMAGE_QUALITY)
+
+def variants_process(image_path: Path, output_dir: Path, stem: str) -> None:
+    process_and_save_image(
+        image_path, output_dir, stem, TARGET_IMAGE_SIZE, IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS, IMAGE_QUALITY
+    )
+
+PIPELINES = {
+    "baseline": baseline_process,
+    "fast": fast_process,
+    "variants": variants_process,
+}
+
+def measure(pipeline: str, image_path: Path, output_dir: Path) -> tuple[float, int]:
+    # runs in a fresh child process so ru_maxrss only reflects this image
+    # and in an empty directory so output is never reused between runs
+    run_dir = Path(tempfile.mkdtemp(dir=output_dir))
+    started = time.process_time()
+    PIPELINES[pipeline](image_path, run_dir, f"{pipeline}_{image_path.stem}")
+    cpu_time = time.process_time() - started
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return cpu_time, peak_rss_kb
+
+def build_synthetic_corpus(corpus_dir: Path) -> list[Path]:
+    paths = []
+    for width, height in SYNTHETIC_SIZES:
+        path = corpus_dir / f"synthetic_{width}x{height}.jpg"
+        # noise compresses like a real photo, unlike a flat colour
+        Image.effect_noise((width, height), 64).convert("RGB").save(path, format="JPEG", quality=92)
+        paths.append(path)
+    return paths
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-image CPU time and peak RSS of the meal image pipeline")
+    parser.add_argument("corpus", nargs="?", type=Path, help="directory of source images, synthetic photos when omitted")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--pipelines", default=",".join(PIPELINES))
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="image_pipeline_"))
+    try:
+        if args.corpus:
+            images = sorted(path for path in args.corpus.iterdir() if path.is_file())
+        else:
+            images = build_synthetic_corpus(work_dir)
+        output_dir = work_dir / "output"
+        output_dir.mkdir()
+        context = multiprocessing.get_context("spawn")
+        print(f"{'pipeline':<10} {'image':<32} {'megapixels':>10} {'cpu ms (median)':>16} {'peak rss MB':>12}")
+        for pipeline in args.pipelines.split(","):
+            for image_path in images:
+                with Image.open(image_path) as image:
+                    megapixels = image.width * image.height / 1_000_000
+                cpu_times = []
+                peak_rss = 0
+                for _ in range(args.repeat):
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                        cpu_time, peak_rss_kb = executor.submit(measure, pipeline, image_path, output_dir).result()
+                    cpu_times.append(cpu_time)
+                    peak_rss = max(peak_rss, peak_rss_kb)
+                print(
+                    f"{pipeline:<10} {image_path.name[:32]:<32} {megapixels:>10.1f} "
+                    f"{statistics.median(cpu_times) * 1000:>16.1f} {peak_rss / 1024:>12.1f}"
+                )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,22 @@
 import asyncio
 from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import List
 from starlette import status
-import uuid
-from fastapi import HTTPException, UploadFile
+from fastapi import HTTPException
 from PIL import UnidentifiedImageError
+from pottery.exceptions import QuorumNotAchieved
+from redis.asyncio import Redis
 
-from ....infrastructure.utils.image_processing import process_and_save_image
-from ....infrastructure.config.variables import IMAGE_QUALITY, TARGET_IMAGE_SIZE, UPLOAD_FOLDER
+from ....infrastructure.config.redlock_connection_manager import image_redlock
+from ....infrastructure.utils.image_processing import content_hash, process_and_save_image
+from ....infrastructure.config.variables import (
+    IMAGE_QUALITY,
+    IMAGE_VARIANT_FORMATS,
+    IMAGE_VARIANT_SIZES,
+    TARGET_IMAGE_SIZE,
+    UPLOAD_FOLDER,
+)
 from ....application.schema.response.meal_response_schema import CreateMealResponse
 from ....domain.repository.meal_repository import MealRepository
 
@@ -16,9 +25,9 @@ class CreateMealCommand:
     name: str
     description: str
     price: int
-    picture: UploadFile
+    picture: Path
 
-    def __init__(self, name: str, description: str, price: int, picture: UploadFile):
+    def __init__(self, name: str, description: str, price: int, picture: Path):
         self.name = name
         self.description = description
         self.price = price
@@ -27,40 +36,55 @@ class CreateMealCommand:
 class CreateMealCommandHandler:
     meal_repository: MealRepository
     executor: ProcessPoolExecutor
+    redlock_connection_manager: List[Redis]
 
-    def __init__(self, meal_repository: MealRepository, executor: ProcessPoolExecutor):
+    def __init__(
+        self,
+        meal_repository: MealRepository,
+        executor: ProcessPoolExecutor,
+        redlock_connection_manager: List[Redis],
+    ):
         self.meal_repository = meal_repository
         self.executor = executor
+        self.redlock_connection_manager = redlock_connection_manager
 
     async def handle(self, command: CreateMealCommand) -> CreateMealResponse:
-        new_filename = f"{uuid.uuid4()}.jpg"
-        file_path = Path(UPLOAD_FOLDER) / new_filename
-        image_url = f"/{UPLOAD_FOLDER}/{new_filename}"
+        loop = asyncio.get_running_loop()
         try:
-            image_bytes = await command.picture.read()
-            if not image_bytes:
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File ảnh rỗng")
-            loop = asyncio.get_running_loop()
-            await loop.run_in_executor(
+            stem = await loop.run_in_executor(
                 self.executor,
-                process_and_save_image,
-                image_bytes, file_path, TARGET_IMAGE_SIZE, IMAGE_QUALITY
+                content_hash,
+                command.picture, TARGET_IMAGE_SIZE, IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS, IMAGE_QUALITY
             )
-        except (UnidentifiedImageError, IOError, Exception) as e:
-            if file_path.exists():
-                file_path.unlink(missing_ok=True)
-            if isinstance(e, UnidentifiedImageError):
-                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=f"{e}")
-            else:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,detail=f"{e}")
-        finally:
-            await command.picture.close()
-        created_meal = await self.meal_repository.create(
-            name=command.name,
-            description=command.description,
-            price=command.price,
-            image_url=image_url
-        )
+        except IOError:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Có lỗi khi đọc ảnh tải lên")
+        try:
+            # the files may already exist for another meal, keep them from being removed until this meal points at them
+            async with image_redlock(self.redlock_connection_manager, stem):
+                try:
+                    variant_filenames = await loop.run_in_executor(
+                        self.executor,
+                        process_and_save_image,
+                        command.picture, Path(UPLOAD_FOLDER), stem, TARGET_IMAGE_SIZE,
+                        IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS, IMAGE_QUALITY
+                    )
+                except (UnidentifiedImageError, IOError, Exception) as e:
+                    if isinstance(e, UnidentifiedImageError):
+                        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=f"{e}")
+                    else:
+                        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,detail=f"{e}")
+                created_meal = await self.meal_repository.create(
+                    name=command.name,
+                    description=command.description,
+                    price=command.price,
+                    image_url=f"/{UPLOAD_FOLDER}/{stem}.jpg",
+                    image_variants={
+                        image_format: {width: f"/{UPLOAD_FOLDER}/{filename}" for width, filename in filenames.items()}
+                        for image_format, filenames in variant_filenames.items()
+                    },
+                )
+        except QuorumNotAchieved:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Ảnh đang được xử lý, vui lòng thử lại sau")
         return CreateMealResponse(
             id=created_meal.id,
             name=created_meal.name,
@@ -69,5 +93,6 @@ class CreateMealCommandHandler:
             updated_at=created_meal.updated_at,
             is_available=created_meal.is_available,
             price=created_meal.price,
-            image_url=created_meal.image_url
+            image_url=created_meal.image_url,
+            image_srcset=created_meal.image_srcset
         )
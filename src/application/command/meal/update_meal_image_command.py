@@ -2,24 +2,30 @@ import asyncio
 from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List
-import uuid
-from fastapi import HTTPException, UploadFile
+from fastapi import HTTPException
 from pottery.exceptions import QuorumNotAchieved
 from starlette import status
 from PIL import UnidentifiedImageError
 from redis.asyncio import Redis
 from pottery import AIORedlock
 
-from ....infrastructure.config.variables import IMAGE_QUALITY, TARGET_IMAGE_SIZE, UPLOAD_FOLDER
+from ....infrastructure.config.variables import (
+    IMAGE_QUALITY,
+    IMAGE_VARIANT_FORMATS,
+    IMAGE_VARIANT_SIZES,
+    TARGET_IMAGE_SIZE,
+    UPLOAD_FOLDER,
+)
 from ....application.schema.response.meal_response_schema import UpdateMealImageResponse
 from ....domain.repository.meal_repository import MealRepository
-from ....infrastructure.utils.image_processing import process_and_save_image
+from ....infrastructure.config.redlock_connection_manager import image_redlock
+from ....infrastructure.utils.image_processing import content_hash, process_and_save_image, remove_image_files
 
 class UpdateMealImageCommand:
     id: int
-    picture: UploadFile
+    picture: Path
 
-    def __init__(self, id: int, picture: UploadFile):
+    def __init__(self, id: int, picture: Path):
         self.id = id
         self.picture = picture
 
@@ -51,40 +57,57 @@ class UpdateMealImageCommandHandler:
                 meal_entity = await self.meal_repository.get_by_id(id=command.id)
                 if not meal_entity:
                     raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Món ăn không tồn tại")
-                new_filename = f"{uuid.uuid4()}.jpg"
-                file_path = Path(UPLOAD_FOLDER) / new_filename
-                new_image_url = f"/{UPLOAD_FOLDER}/{new_filename}"
+                loop = asyncio.get_running_loop()
                 try:
-                    image_bytes = await command.picture.read()
-                    if not image_bytes:
-                        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File ảnh rỗng")
-                    loop = asyncio.get_running_loop()
-                    await loop.run_in_executor(
+                    stem = await loop.run_in_executor(
                         self.executor,
-                        process_and_save_image,
-                        image_bytes, file_path, TARGET_IMAGE_SIZE, IMAGE_QUALITY
+                        content_hash,
+                        command.picture, TARGET_IMAGE_SIZE, IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS, IMAGE_QUALITY
                     )
-                except (UnidentifiedImageError, IOError, Exception) as e:
-                    if file_path.exists():
-                        file_path.unlink(missing_ok=True)
-                    if isinstance(e, UnidentifiedImageError):
-                        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=f"{e}")
-                    else:
-                        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,detail=f"{e}")
-                finally:
-                    await command.picture.close()
-                old_image_url = meal_entity.image_url.lstrip("/")
-                meal_entity.image_url = new_image_url
-                updated_meal = await self.meal_repository.update(meal_entity=meal_entity)
-                if not updated_meal:
-                    if file_path and file_path.exists():
-                        file_path.unlink(missing_ok=True)
-                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cập nhật ảnh cho món ăn thất bại")
-                if old_image_url and Path(old_image_url).exists():
-                    Path(old_image_url).unlink(missing_ok=True)
+                except IOError:
+                    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Có lỗi khi đọc ảnh tải lên")
+                new_image_url = f"/{UPLOAD_FOLDER}/{stem}.jpg"
+                old_image_url = meal_entity.image_url
+                old_image_variants = meal_entity.image_variants
+                # the files may already exist for another meal, keep them from being removed until this meal points at them
+                async with image_redlock(self.redlock_connection_manager, stem):
+                    created_files = not Path(new_image_url.lstrip("/")).exists()
+                    try:
+                        variant_filenames = await loop.run_in_executor(
+                            self.executor,
+                            process_and_save_image,
+                            command.picture, Path(UPLOAD_FOLDER), stem, TARGET_IMAGE_SIZE,
+                            IMAGE_VARIANT_SIZES, IMAGE_VARIANT_FORMATS, IMAGE_QUALITY
+                        )
+                    except (UnidentifiedImageError, IOError, Exception) as e:
+                        if isinstance(e, UnidentifiedImageError):
+                            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,detail=f"{e}")
+                        else:
+                            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,detail=f"{e}")
+                    meal_entity.image_url = new_image_url
+                    meal_entity.image_variants = {
+                        image_format: {width: f"/{UPLOAD_FOLDER}/{filename}" for width, filename in filenames.items()}
+                        for image_format, filenames in variant_filenames.items()
+                    }
+                    updated_meal = await self.meal_repository.update(meal_entity=meal_entity)
+                    if not updated_meal:
+                        # files that were already on disk belong to whoever wrote them
+                        if created_files and await self.meal_repository.count_by_image_url(image_url=new_image_url) == 0:
+                            remove_image_files(Path(UPLOAD_FOLDER), stem, variant_filenames)
+                        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cập nhật ảnh cho món ăn thất bại")
+                # identical pictures share one set of files, only unlink once no meal points at them;
+                # taken after the new lock is released so two swaps in opposite directions cannot deadlock
+                if old_image_url and old_image_url != new_image_url:
+                    async with image_redlock(self.redlock_connection_manager, Path(old_image_url).stem):
+                        if await self.meal_repository.count_by_image_url(image_url=old_image_url) == 0:
+                            Path(old_image_url.lstrip("/")).unlink(missing_ok=True)
+                            for variants in old_image_variants.values():
+                                for variant_url in variants.values():
+                                    Path(variant_url.lstrip("/")).unlink(missing_ok=True)
                 return UpdateMealImageResponse(
                     id=updated_meal.id,
                     image_url=updated_meal.image_url,
+                    image_srcset=updated_meal.image_srcset,
                 )
         except QuorumNotAchieved:
             raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Đã có yêu cầu cập nhật ảnh, vui lòng thử lại sau")
@@ -29,11 +29,10 @@ class CreateOrderCommandHandler:
         meal_counts = Counter(command.meal_ids)
         meals_with_quantities: Dict[MealEntity, int] = {}
         meal_lookup: Dict[int, MealEntity] = {}
-        for meal_id in set(command.meal_ids):
-            meal = await self.meal_repository.get_by_id(meal_id)
-            if meal and meal.is_available:
+        for meal_id, meal in (await self.meal_repository.get_by_ids(ids=meal_counts.keys())).items():
+            if meal.is_available:
                 meals_with_quantities[meal] = meal_counts[meal_id]
-                meal_lookup[meal.id] = meal
+                meal_lookup[meal_id] = meal
         if not meals_with_quantities:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ID món ăn không hợp lệ")
         new_order = await self.order_repository.create_order(
@@ -50,7 +49,6 @@ class CreateOrderCommandHandler:
                 for meal, quantity in meals_with_quantities.items()
             ]
         )
-        order_meal_list = await self.order_repository.get_order_meal_list(order_id=new_order.id)
         return CreateOrderResponse(
             id=new_order.id,
             updated_at=new_order.updated_at,
@@ -66,6 +64,6 @@ class CreateOrderCommandHandler:
                     description=meal_lookup[order_meal.meal_id].description,
                     image_url=meal_lookup[order_meal.meal_id].image_url,
                 )
-                for order_meal in order_meal_list
+                for order_meal in new_order.order_meals
             ]
         )
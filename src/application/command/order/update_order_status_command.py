@@ -33,12 +33,11 @@ class UpdateOrderStatusCommandHandler:
         updated_order = await self.order_repository.update_order_status(order_id=command.order_id, status=command.status)
         if not updated_order:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cập nhật trạng thái đơn hàng thất bại")
-        order_meal_list = await self.order_repository.get_order_meal_list(order_id=updated_order.id)
-        meal_lookup: Dict[int, MealEntity] = {}
-        for order_meal in order_meal_list:
-            meal = await self.meal_repository.get_by_id(id=order_meal.meal_id)
-            if meal:
-                meal_lookup[order_meal.meal_id] = meal
+        # the update already loaded the order's meals in the same transaction
+        order_meal_list = updated_order.order_meals
+        meal_lookup: Dict[int, MealEntity] = await self.meal_repository.get_by_ids(
+            ids=[order_meal.meal_id for order_meal in order_meal_list]
+        )
         return UpdateOrderStatusResponse(
             id=updated_order.id,
             updated_at=updated_order.updated_at,
@@ -4,7 +4,7 @@ from ....application.schema.response.user_response_schema import LoginUserRespon
 from ....domain.repository.user_repository import UserRepository
 from ....infrastructure.utils.token_util import create_access_token, create_refresh_token
 
-from ....infrastructure.config.cryptography import bcrypt_context
+from ....infrastructure.config.cryptography import password_hasher
 
 class LoginUserCommand:
     email: str
@@ -24,7 +24,8 @@ class LoginUserCommandHandler:
         user_entity = await self.user_repository.get_by_email(email=command.email)
         if not user_entity:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email chưa đăng ký tài khoản")
-        if not bcrypt_context.verify(command.password, user_entity.hashed_password):
+        verified, new_hashed_password = await password_hasher.verify_and_update(command.password, user_entity.hashed_password)
+        if not verified:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Email hoặc mật khẩu không chính xác")
         if user_entity.is_active == False:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Tài khoản đã bị vô hiệu hóa")
@@ -33,6 +34,8 @@ class LoginUserCommandHandler:
         refresh_token = create_refresh_token(user_id=user_entity.id, role=user_entity.role)
         access_token = create_access_token(user_id=user_entity.id, role=user_entity.role)
         user_entity.refresh_token = refresh_token
+        if new_hashed_password is not None:
+            user_entity.hashed_password = new_hashed_password
         await self.user_repository.update(user_entity=user_entity)
         return LoginUserResponse(
             refresh_token=refresh_token,
@@ -14,9 +14,10 @@ class LogoutUserCommandHandler:
     def __init__(self, user_repository: UserRepository):
         self.user_repository = user_repository
     
-    async def handle(self, command: LogoutUserCommand) -> None:
+    async def handle(self, command: LogoutUserCommand) -> int:
         user_entity = await self.user_repository.get_by_refresh_token(refresh_token=command.refresh_token)
         if not user_entity:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Token không hợp lệ")
         user_entity.refresh_token = None
-        await self.user_repository.update(user_entity=user_entity)
\ No newline at end of file
+        await self.user_repository.update(user_entity=user_entity)
+        return user_entity.id
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import HTTPException
 from ....application.schema.response.user_response_schema import RegisterUserResponse
 from ....domain.repository.user_repository import UserRepository
 from starlette import status
-from ....infrastructure.config.cryptography import bcrypt_context
+from ....infrastructure.config.cryptography import password_hasher
 
 class RegisterUserCommand:
     full_name: str
@@ -33,7 +33,7 @@ class RegisterUserCommandHandler:
             phone_number=command.phone_number,
             email=command.email,
             address=command.address,
-            hashed_password=bcrypt_context.hash(command.password)
+            hashed_password=await password_hasher.hash(command.password)
         )
         return RegisterUserResponse(
             id=created_user.id,
@@ -2,7 +2,7 @@ from datetime import datetime, timedelta
 from fastapi import HTTPException
 from starlette import status
 
-from ....infrastructure.config.cryptography import bcrypt_context
+from ....infrastructure.config.cryptography import password_hasher
 from ...schema.response.user_response_schema import ResetPasswordResponse
 from ....domain.repository.reset_password_code_repository import ResetPasswordCodeRepository
 from ....domain.repository.user_repository import UserRepository
@@ -44,7 +44,7 @@ class ResetPasswordCommandHandler:
         delete_code_result = await self.reset_password_code_repository.delete_by_user_id(user_id=user_entity.id)
         if delete_code_result == False:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Có lỗi xảy ra khi hủy mã khôi phục")
-        user_entity.hashed_password = bcrypt_context.hash(command.new_password)
+        user_entity.hashed_password = await password_hasher.hash(command.new_password)
         updated_user = await self.user_repository.update(user_entity=user_entity)
         if updated_user is None:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Có lỗi xảy ra khi cập nhật mật khẩu mới")
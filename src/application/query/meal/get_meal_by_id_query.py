@@ -27,5 +27,6 @@ class GetMealByIdQueryHandler:
             updated_at=meal_entity.updated_at,
             is_available=meal_entity.is_available,
             price=meal_entity.price,
-            image_url=meal_entity.image_url
+            image_url=meal_entity.image_url,
+            image_srcset=meal_entity.image_srcset
         )
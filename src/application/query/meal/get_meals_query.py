@@ -1,3 +1,6 @@
+from typing import Optional
+
+from ....infrastructure.utils.cursor_util import decode_meal_cursor, encode_meal_cursor
 from ....application.schema.response.meal_response_schema import GetMealResponse, GetMealsResponse
 from ....domain.repository.meal_repository import MealRepository
 
@@ -6,11 +9,13 @@ class GetMealsQuery:
     page: int
     size: int
     is_available: bool | None
+    cursor: Optional[str]
     
-    def __init__(self, page: int, size: int, is_available: bool | None):
+    def __init__(self, page: int, size: int, is_available: bool | None, cursor: Optional[str] = None):
         self.page = page
         self.size = size
         self.is_available = is_available
+        self.cursor = cursor
         
 class GetMealsQueryHandler:
     meal_repository: MealRepository
@@ -19,7 +24,16 @@ class GetMealsQueryHandler:
         self.meal_repository = meal_repository
         
     async def handle(self, query: GetMealsQuery) -> GetMealsResponse:
-        meal_entities = await self.meal_repository.get_list(page=query.page, size=query.size, is_available=query.is_available)
+        after_id = decode_meal_cursor(query.cursor) if query.cursor else None
+        meal_entities = await self.meal_repository.get_list(
+            page=query.page,
+            size=query.size,
+            is_available=query.is_available,
+            after_id=after_id,
+        )
+        next_cursor = None
+        if len(meal_entities) == query.size:
+            next_cursor = encode_meal_cursor(id=meal_entities[-1].id)
         return GetMealsResponse(
             meals=[
                 GetMealResponse(
@@ -30,10 +44,12 @@ class GetMealsQueryHandler:
                     updated_at=meal_entity.updated_at,
                     is_available=meal_entity.is_available,
                     price=meal_entity.price,
-                    image_url=meal_entity.image_url
+                    image_url=meal_entity.image_url,
+                    image_srcset=meal_entity.image_srcset
                 )
                 for meal_entity in meal_entities
             ],
             page=query.page,
             size=query.size,
-        )
\ No newline at end of file
+            next_cursor=next_cursor,
+        )
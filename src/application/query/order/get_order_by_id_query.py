@@ -25,12 +25,10 @@ class GetOrderByIdQueryHandler:
         order = await self.order_repository.find_order_by_id(order_id=query.order_id)
         if not order:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Đơn hàng không tồn tại")
-        order_meals = await self.order_repository.get_order_meal_list(order_id=query.order_id)
-        meal_lookup: dict[int, MealEntity] = {}
-        for meal in order_meals:
-            meal_result = await self.meal_repository.get_by_id(id=meal.meal_id)
-            if meal_result:
-                meal_lookup[meal.meal_id] = meal_result
+        order_meals = order.order_meals
+        meal_lookup: dict[int, MealEntity] = await self.meal_repository.get_by_ids(
+            ids=[order_meal.meal_id for order_meal in order_meals]
+        )
         return GetOrderByIdResponse(
             id=order.id,
             updated_at=order.updated_at,
@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+
+class GetDatabasePoolStatsResponse(BaseModel):
+    pid: int
+    pool_size: int
+    max_overflow: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+
+class GetReadinessResponse(BaseModel):
+    ready: bool
+    revision: str | None
+    head_revision: str | None
+
+class WebsocketFanOutStatsResponse(BaseModel):
+    connections: int
+    broadcasts: int
+    evicted: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+class GetWebsocketStatsResponse(BaseModel):
+    pid: int
+    order: WebsocketFanOutStatsResponse
+    staff: WebsocketFanOutStatsResponse
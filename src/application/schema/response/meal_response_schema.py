@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel
 
@@ -12,11 +13,13 @@ class GetMealResponse(BaseModel):
     is_available: bool
     price: int
     image_url: str
+    image_srcset: dict[str, str] = {}
 
 class GetMealsResponse(BaseModel):
     meals: list[GetMealResponse]
     page: int
     size: int
+    next_cursor: Optional[str] = None
 
 class CreateMealResponse(BaseModel):
     id: int
@@ -27,6 +30,7 @@ class CreateMealResponse(BaseModel):
     is_available: bool
     price: int
     image_url: str
+    image_srcset: dict[str, str] = {}
 
 class DisableMealResponse(BaseModel):
     message: str
@@ -46,3 +50,4 @@ class UpdateMealDataResponse(BaseModel):
 class UpdateMealImageResponse(BaseModel):
     id: int
     image_url: str
+    image_srcset: dict[str, str] = {}
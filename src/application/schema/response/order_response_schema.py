@@ -52,3 +52,4 @@ class GetOrderPaginationResponse(BaseModel):
     page: int
     size: int
     orders: List[GetOrderByIdResponse]
+    next_cursor: Optional[str] = None
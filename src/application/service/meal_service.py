@@ -1,6 +1,6 @@
 from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, List
-from fastapi import UploadFile
+from pathlib import Path
 from redis.asyncio import Redis
 
 from ...application.command.meal.update_meal_image_command import UpdateMealImageCommand, UpdateMealImageCommandHandler
@@ -39,11 +39,12 @@ class MealService:
         command_handler = DisableMealCommandHandler(meal_repository=self.meal_repository)
         return await command_handler.handle(command=command)
 
-    async def create_meal(self, name: str, description: str, price: int, picture: UploadFile) -> CreateMealResponse:
+    async def create_meal(self, name: str, description: str, price: int, picture: Path) -> CreateMealResponse:
         command = CreateMealCommand(name=name, description=description, price=price, picture=picture)
         command_handler = CreateMealCommandHandler(
             meal_repository=self.meal_repository,
             executor=self.process_executor,
+            redlock_connection_manager=self.redlock_connection_manager
         )
         return await command_handler.handle(command=command)
 
@@ -52,8 +53,8 @@ class MealService:
         query_handler = GetMealByIdQueryHandler(meal_repository=self.meal_repository)
         return await query_handler.handle(query=query)
 
-    async def get_meals(self, page: int, size: int, is_available: bool | None) -> GetMealsResponse:
-        query = GetMealsQuery(page=page, size=size, is_available=is_available)
+    async def get_meals(self, page: int, size: int, is_available: bool | None, cursor: Optional[str] = None) -> GetMealsResponse:
+        query = GetMealsQuery(page=page, size=size, is_available=is_available, cursor=cursor)
         query_handler = GetMealsQueryHandler(meal_repository=self.meal_repository)
         return await query_handler.handle(query=query)
 
@@ -67,7 +68,7 @@ class MealService:
         command_handler = UpdateMealDataCommandHandler(meal_repository=self.meal_repository)
         return await command_handler.handle(command=command)
 
-    async def update_meal_image(self, id: int, picture: UploadFile) -> UpdateMealImageResponse:
+    async def update_meal_image(self, id: int, picture: Path) -> UpdateMealImageResponse:
         command = UpdateMealImageCommand(
             id=id,
             picture=picture,
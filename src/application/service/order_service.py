@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from ...application.query.order.get_order_pagination_query import GetOrderPaginationQuery, GetOrderPaginationQueryHandler
 from ...application.query.order.get_order_by_id_query import GetOrderByIdQuery, GetOrderByIdQueryHandler
@@ -63,10 +63,7 @@ class OrderService:
         )
         return await query_handler.handle(query=query)
 
-    async def get_order_pagination(self, page: int, size: int, is_order_responsible: bool | None) -> GetOrderPaginationResponse:
-        query = GetOrderPaginationQuery(page=page, size=size, is_order_responsible=is_order_responsible)
-        query_handler = GetOrderPaginationQueryHandler(
-            order_repository=self.order_repository,
-            meal_repository=self.meal_repository,
-        )
+    async def get_order_pagination(self, page: int, size: int, is_order_responsible: bool | None, cursor: Optional[str] = None) -> GetOrderPaginationResponse:
+        query = GetOrderPaginationQuery(page=page, size=size, is_order_responsible=is_order_responsible, cursor=cursor)
+        query_handler = GetOrderPaginationQueryHandler(order_repository=self.order_repository)
         return await query_handler.handle(query=query)
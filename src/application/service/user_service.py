@@ -33,10 +33,10 @@ class UserService:
         self.user_repository = user_repository
         self.reset_password_code_repository = reset_password_code_repository
 
-    async def logout_user(self, refresh_token: str) -> None:
+    async def logout_user(self, refresh_token: str) -> int:
         command = LogoutUserCommand(refresh_token=refresh_token)
         command_handler = LogoutUserCommandHandler(user_repository=self.user_repository)
-        await command_handler.handle(command=command)
+        return await command_handler.handle(command=command)
 
     async def login_user(self, email: str, password: str) -> LoginUserResponse:
         command = LoginUserCommand(email=email, password=password)
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque, Hashable, Optional, Tuple
+from fastapi import WebSocket
+from starlette import status
+
+class OverflowPolicy:
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
+class ClientConnection:
+    websocket: WebSocket
+    max_size: int
+    overflow_policy: str
+    send_timeout: float
+    queue: Deque[Tuple[Optional[Hashable], str, float]]
+    pending: asyncio.Event
+    writer_task: Optional["asyncio.Task[None]"]
+    closed: bool
+    dropped: int
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_size: int,
+        overflow_policy: str,
+        send_timeout: float,
+        on_sent: Callable[[float], None],
+        on_close: Callable[["ClientConnection"], None],
+    ):
+        self.websocket = websocket
+        self.max_size = max_size
+        self.overflow_policy = overflow_policy
+        self.send_timeout = send_timeout
+        self.on_sent = on_sent
+        self.on_close = on_close
+        self.queue = deque()
+        self.pending = asyncio.Event()
+        self.writer_task = None
+        self.closed = False
+        self.dropped = 0
+
+    def start(self) -> None:
+        self.writer_task = asyncio.create_task(self.run_writer())
+
+    def enqueue(self, text: str, coalesce_key: Optional[Hashable] = None) -> bool:
+        if self.closed:
+            return False
+        enqueued_at = time.perf_counter()
+        if self.overflow_policy == OverflowPolicy.COALESCE and coalesce_key is not None:
+            for index, (key, _, queued_at) in enumerate(self.queue):
+                if key == coalesce_key:
+                    # keep the original position and age, only the latest payload is worth sending
+                    self.queue[index] = (coalesce_key, text, queued_at)
+                    self.dropped += 1
+                    return True
+        if len(self.queue) >= self.max_size:
+            if self.overflow_policy == OverflowPolicy.DISCONNECT:
+                return False
+            self.queue.popleft()
+            self.dropped += 1
+        self.queue.append((coalesce_key, text, enqueued_at))
+        self.pending.set()
+        return True
+
+    async def run_writer(self) -> None:
+        try:
+            while True:
+                if not self.queue:
+                    self.pending.clear()
+                    await self.pending.wait()
+                    continue
+                _, text, enqueued_at = self.queue.popleft()
+                await asyncio.wait_for(self.websocket.send_text(text), timeout=self.send_timeout)
+                self.on_sent((time.perf_counter() - enqueued_at) * 1000)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await self.close()
+
+    async def close(self, code: int = status.WS_1011_INTERNAL_ERROR) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self.writer_task is not None and self.writer_task is not asyncio.current_task():
+            self.writer_task.cancel()
+        self.on_close(self)
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            pass
+
+    def stop(self) -> None:
+        self.closed = True
+        self.queue.clear()
+        if self.writer_task is not None:
+            self.writer_task.cancel()
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from ...infrastructure.config.variables import WEBSOCKET_COALESCE_WINDOW
+
+logger = logging.getLogger(__name__)
+
+class Coalescer:
+    window: float
+    flush: Callable[[Dict[Hashable, Any]], Awaitable[None]]
+    pending: Dict[Hashable, Any]
+    flush_task: Optional["asyncio.Task[None]"]
+
+    def __init__(self, flush: Callable[[Dict[Hashable, Any]], Awaitable[None]], window: float = WEBSOCKET_COALESCE_WINDOW):
+        self.window = window
+        self.flush = flush
+        self.pending = {}
+        self.flush_task = None
+
+    def add(self, key: Hashable, value: Any) -> None:
+        # the latest value per key wins, keys keep their first-seen order
+        self.pending[key] = value
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_after_window())
+
+    async def flush_after_window(self) -> None:
+        try:
+            await asyncio.sleep(self.window)
+        except asyncio.CancelledError:
+            # deliver what was collected before giving up, a second cancel can't interrupt it
+            await asyncio.shield(self.flush_pending())
+            raise
+        await self.flush_pending()
+
+    async def flush_pending(self) -> None:
+        batch, self.pending = self.pending, {}
+        self.flush_task = None
+        if not batch:
+            return
+        try:
+            await self.flush(batch)
+        except Exception:
+            logger.warning("Failed to flush coalesced websocket messages", exc_info=True)
+
+    async def close(self) -> None:
+        # on shutdown: cancel the pending window, its cancel handler delivers the batch before the task ends
+        flush_task = self.flush_task
+        if flush_task is not None:
+            flush_task.cancel()
+            try:
+                await flush_task
+            except asyncio.CancelledError:
+                pass
+        # a task cancelled before it first ran never reached its handler
+        await self.flush_pending()
@@ -0,0 +1,95 @@
+import json
+import math
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional
+from fastapi import WebSocket
+
+from .client_connection import ClientConnection
+from ...infrastructure.config.variables import (
+    WEBSOCKET_OVERFLOW_POLICY,
+    WEBSOCKET_QUEUE_SIZE,
+    WEBSOCKET_SEND_TIMEOUT,
+)
+
+LATENCY_SAMPLE_SIZE = 1024
+
+# closes that reach the app from below it: a missed ping (1011) or a dropped transport (1006)
+SERVER_CLOSE_CODES = (1006, 1011)
+
+class FanOut:
+    send_timeout: float
+    queue_size: int
+    overflow_policy: str
+    latencies: Deque[float]
+    broadcasts: int
+    evicted: int
+
+    def __init__(
+        self,
+        send_timeout: float = WEBSOCKET_SEND_TIMEOUT,
+        queue_size: int = WEBSOCKET_QUEUE_SIZE,
+        overflow_policy: str = WEBSOCKET_OVERFLOW_POLICY,
+    ):
+        self.send_timeout = send_timeout
+        self.queue_size = queue_size
+        self.overflow_policy = overflow_policy
+        self.latencies = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self.broadcasts = 0
+        self.evicted = 0
+
+    def open(self, websocket: WebSocket, on_close: Callable[[ClientConnection], None]) -> ClientConnection:
+        connection = ClientConnection(
+            websocket=websocket,
+            max_size=self.queue_size,
+            overflow_policy=self.overflow_policy,
+            send_timeout=self.send_timeout,
+            on_sent=self.latencies.append,
+            on_close=self.evict(on_close),
+        )
+        connection.start()
+        return connection
+
+    def evict(self, on_close: Callable[[ClientConnection], None]) -> Callable[[ClientConnection], None]:
+        def handler(connection: ClientConnection) -> None:
+            self.evicted += 1
+            on_close(connection)
+        return handler
+
+    def record_close(self, code: Optional[int]) -> None:
+        if code in SERVER_CLOSE_CODES:
+            self.evicted += 1
+
+    async def send(
+        self,
+        connections: Iterable[ClientConnection],
+        message: Dict[str, Any],
+        coalesce_key: Optional[Hashable] = None,
+    ) -> None:
+        targets = list(connections)
+        if not targets:
+            return
+        text = json.dumps(message)
+        self.broadcasts += 1
+        overflowed: List[ClientConnection] = [
+            connection
+            for connection in targets
+            if not connection.enqueue(text, coalesce_key=coalesce_key)
+        ]
+        for connection in overflowed:
+            await connection.close()
+
+    def percentile(self, percent: float) -> float:
+        if not self.latencies:
+            return 0.0
+        samples = sorted(self.latencies)
+        index = min(len(samples) - 1, max(0, math.ceil(percent / 100 * len(samples)) - 1))
+        return round(samples[index], 3)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "broadcasts": self.broadcasts,
+            "evicted": self.evicted,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(max(self.latencies), 3) if self.latencies else 0.0,
+        }
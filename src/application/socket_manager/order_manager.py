@@ -1,29 +1,67 @@
+from typing import Any, Dict, Hashable, Optional
 from fastapi import WebSocket
 
+from .client_connection import ClientConnection
+from .coalescer import Coalescer
+from .fan_out import FanOut
+from ...infrastructure.config.broadcasting import BroadcastChannel, Broadcaster, broadcaster
+
 class OrderManager:
-    client_connection: dict[int, list[WebSocket]]
+    client_connection: dict[int, list[ClientConnection]]
+    broadcaster: Broadcaster
+    fan_out: FanOut
+    coalescer: Coalescer
 
-    def __init__(self):
+    def __init__(self, broadcaster: Broadcaster):
         self.client_connection = {}
+        self.broadcaster = broadcaster
+        self.fan_out = FanOut()
+        self.coalescer = Coalescer(flush=self.flush)
+        self.broadcaster.register(BroadcastChannel.ORDER_STATUS, self.deliver)
 
-    async def connect(self, client_websocket: WebSocket, order_id: int):
+    async def connect(self, client_websocket: WebSocket, order_id: int) -> ClientConnection:
         await client_websocket.accept()
         if order_id not in self.client_connection:
             self.client_connection[order_id] = []
-        self.client_connection[order_id].append(client_websocket)
+        connection = self.fan_out.open(
+            websocket=client_websocket,
+            on_close=lambda connection: self.remove(connection=connection, order_id=order_id),
+        )
+        self.client_connection[order_id].append(connection)
+        return connection
 
-    def disconnect(self, client_websocket: WebSocket, order_id: int):
-        if order_id in self.client_connection:
-            self.client_connection[order_id].remove(client_websocket)
+    def disconnect(self, client_websocket: WebSocket, order_id: int, close_code: Optional[int] = None):
+        for connection in list(self.client_connection.get(order_id, [])):
+            if connection.websocket is client_websocket:
+                connection.stop()
+                self.fan_out.record_close(close_code)
+                self.remove(connection=connection, order_id=order_id)
+
+    def remove(self, connection: ClientConnection, order_id: int):
+        if order_id in self.client_connection and connection in self.client_connection[order_id]:
+            self.client_connection[order_id].remove(connection)
             if not self.client_connection[order_id]:
                 del self.client_connection[order_id]
 
     async def broadcast(self, order_id: int, order_status: str):
+        await self.broadcaster.publish(BroadcastChannel.ORDER_STATUS, {
+            "order_id": order_id,
+            "order_status": order_status
+        })
+
+    async def deliver(self, message: Dict[str, Any]):
+        order_id = message["order_id"]
         if order_id in self.client_connection:
-            for connection in self.client_connection[order_id]:
-                await connection.send_json({
-                    "order_id": order_id,
-                    "order_status": order_status
-                })
+            self.coalescer.add(order_id, message)
+
+    async def flush(self, messages: Dict[Hashable, Any]):
+        for order_id, message in messages.items():
+            await self.fan_out.send(self.client_connection.get(order_id, []), message, coalesce_key=order_id) # type: ignore
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": sum(len(connections) for connections in self.client_connection.values()),
+            **self.fan_out.stats(),
+        }
 
-order_manager = OrderManager()
+order_manager = OrderManager(broadcaster=broadcaster)
@@ -1,24 +1,72 @@
+from typing import Any, Dict, Hashable, Optional
 from fastapi import WebSocket
 
+from .client_connection import ClientConnection
+from .coalescer import Coalescer
+from .fan_out import FanOut
+from ...infrastructure.config.broadcasting import BroadcastChannel, Broadcaster, broadcaster
+
 class StaffManager:
-    client_connections: dict[int, WebSocket]
+    client_connections: dict[int, list[ClientConnection]]
+    broadcaster: Broadcaster
+    fan_out: FanOut
+    coalescer: Coalescer
 
-    def __init__(self):
+    def __init__(self, broadcaster: Broadcaster):
         self.client_connections = {}
+        self.broadcaster = broadcaster
+        self.fan_out = FanOut()
+        self.coalescer = Coalescer(flush=self.flush)
+        self.broadcaster.register(BroadcastChannel.NEW_ORDER, self.deliver)
 
     async def handshake_connection(self, client_websocket: WebSocket):
         await client_websocket.accept()
 
-    async def connect(self, client_id: int, client_websocket: WebSocket):
+    async def connect(self, client_id: int, client_websocket: WebSocket) -> ClientConnection:
         if client_id not in self.client_connections:
-            self.client_connections[client_id] = client_websocket
+            self.client_connections[client_id] = []
+        connection = self.fan_out.open(
+            websocket=client_websocket,
+            on_close=lambda connection: self.remove(client_id=client_id, connection=connection),
+        )
+        self.client_connections[client_id].append(connection)
+        return connection
+
+    def disconnect(self, client_id: int, client_websocket: WebSocket, close_code: Optional[int] = None):
+        for connection in list(self.client_connections.get(client_id, [])):
+            if connection.websocket is client_websocket:
+                connection.stop()
+                self.fan_out.record_close(close_code)
+                self.remove(client_id=client_id, connection=connection)
 
-    def disconnect(self, client_id: int):
-        if client_id in self.client_connections:
-            del self.client_connections[client_id]
+    def remove(self, client_id: int, connection: ClientConnection):
+        if client_id in self.client_connections and connection in self.client_connections[client_id]:
+            self.client_connections[client_id].remove(connection)
+            if not self.client_connections[client_id]:
+                del self.client_connections[client_id]
 
     async def broadcast_new_order(self, order_id: int):
-        for client_id, client_websocket in self.client_connections.items():
-            await client_websocket.send_json({"order_id": order_id, "message": "Bạn có đơn hàng mới"})
+        await self.broadcaster.publish(BroadcastChannel.NEW_ORDER, {"order_id": order_id, "message": "Bạn có đơn hàng mới"})
+
+    async def deliver(self, message: Dict[str, Any]):
+        if self.client_connections:
+            self.coalescer.add(message["order_id"], message["order_id"])
+
+    async def flush(self, order_ids: Dict[Hashable, Any]):
+        ids = list(order_ids.values())
+        await self.fan_out.send(
+            [connection for connections in self.client_connections.values() for connection in connections],
+            {
+                "order_id": ids[-1],
+                "order_ids": ids,
+                "message": "Bạn có đơn hàng mới"
+            }
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": sum(len(connections) for connections in self.client_connections.values()),
+            **self.fan_out.stats(),
+        }
 
-staff_manager = StaffManager()
+staff_manager = StaffManager(broadcaster=broadcaster)
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 
 class MealEntity:
@@ -10,6 +11,7 @@ class MealEntity:
     is_available: bool
     price: int
     image_url: str
+    image_variants: dict[str, dict[str, str]]
 
     def __init__(self,
         id: int,
@@ -19,7 +21,8 @@ class MealEntity:
         updated_at: datetime,
         is_available: bool,
         price: int,
-        image_url: str
+        image_url: str,
+        image_variants: Optional[dict[str, dict[str, str]]] = None
     ):
         self.id = id
         self.name = name
@@ -29,3 +32,14 @@ class MealEntity:
         self.is_available = is_available
         self.price = price
         self.image_url = image_url
+        self.image_variants = image_variants or {}
+
+    @property
+    def image_srcset(self) -> dict[str, str]:
+        return {
+            image_format: ", ".join(
+                f"{url} {width}w"
+                for width, url in sorted(variants.items(), key=lambda variant: int(variant[0]))
+            )
+            for image_format, variants in self.image_variants.items()
+        }
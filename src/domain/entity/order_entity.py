@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import Optional
 
+from .order_meal_entity import OrderMealEntity
+
 
 class OrderStatus:
     READY = "READY"
@@ -22,6 +24,7 @@ class OrderEntity:
     updated_at: datetime
     payment_status: str
     staff_id: Optional[int]
+    order_meals: list[OrderMealEntity]
 
     def __init__(
         self,
@@ -32,6 +35,7 @@ class OrderEntity:
         updated_at: datetime,
         payment_status: str,
         staff_id: Optional[int] = None,
+        order_meals: Optional[list[OrderMealEntity]] = None,
     ):
         self.id = id
         self.meals = meals
@@ -40,3 +44,4 @@ class OrderEntity:
         self.updated_at = updated_at
         self.payment_status = payment_status
         self.staff_id = staff_id
+        self.order_meals = order_meals if order_meals is not None else []
@@ -1,4 +1,7 @@
 from datetime import datetime
+from typing import Optional
+
+from .meal_entity import MealEntity
 
 
 class OrderMealEntity:
@@ -9,6 +12,7 @@ class OrderMealEntity:
     quantity: int
     created_at: datetime
     updated_at: datetime
+    meal: Optional[MealEntity]
 
     def __init__(
         self,
@@ -19,6 +23,7 @@ class OrderMealEntity:
         quantity: int,
         created_at: datetime,
         updated_at: datetime,
+        meal: Optional[MealEntity] = None,
     ):
         self.id = id
         self.order_id = order_id
@@ -27,3 +32,4 @@ class OrderMealEntity:
         self.quantity = quantity
         self.created_at = created_at
         self.updated_at = updated_at
+        self.meal = meal
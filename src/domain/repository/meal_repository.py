@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterable, Optional
 
 from ...domain.entity.meal_entity import MealEntity
 
@@ -7,19 +7,30 @@ from ...domain.entity.meal_entity import MealEntity
 class MealRepository(ABC):
     
     @abstractmethod
-    async def get_list(self, page: int, size: int, is_available: bool | None) -> list[MealEntity]:
+    async def get_list(self, page: int, size: int, is_available: bool | None, after_id: Optional[int] = None) -> list[MealEntity]:
         pass
     
     @abstractmethod
     async def get_by_id(self, id: int) -> Optional[MealEntity]:
         pass
     
+    @abstractmethod
+    async def get_by_ids(self, ids: Iterable[int]) -> dict[int, MealEntity]:
+        pass
+    
     @abstractmethod
     async def update(self, meal_entity: MealEntity) -> Optional[MealEntity]:
         pass
     
     @abstractmethod
-    async def create(self, name: str, description: str, price: int, image_url: str) -> MealEntity:
+    async def create(
+        self,
+        name: str,
+        description: str,
+        price: int,
+        image_url: str,
+        image_variants: Optional[dict[str, dict[str, str]]] = None,
+    ) -> MealEntity:
         pass
     
     @abstractmethod
@@ -28,4 +39,8 @@ class MealRepository(ABC):
     
     @abstractmethod
     async def activate(self, id: int) -> bool:
-        pass
\ No newline at end of file
+        pass
+    
+    @abstractmethod
+    async def count_by_image_url(self, image_url: str) -> int:
+        pass
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
 from typing import List
 from typing_extensions import Optional
 
@@ -34,5 +35,12 @@ class OrderRepository(ABC):
         pass
 
     @abstractmethod
-    async def find_orders(self, page: int, size: int, is_order_responsible: bool | None) -> List[OrderEntity]:
+    async def find_orders(
+        self,
+        page: int,
+        size: int,
+        is_order_responsible: bool | None,
+        after_created_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+    ) -> List[OrderEntity]:
         pass
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Set
+from redis import asyncio as aioredis
+
+from .caching import redis
+
+logger = logging.getLogger(__name__)
+
+BROADCAST_PREFIX = 'anteiku-kohi-broadcast'
+
+class BroadcastChannel:
+    ORDER_STATUS = "order_status"
+    NEW_ORDER = "new_order"
+
+class Broadcaster:
+    redis: "aioredis.Redis"
+    handlers: Dict[str, Callable[[Dict[str, Any]], Awaitable[None]]]
+    delivery_tasks: Set["asyncio.Task[None]"]
+
+    def __init__(self, redis: "aioredis.Redis"):
+        self.redis = redis
+        self.handlers = {}
+        self.delivery_tasks = set()
+
+    def channel_name(self, channel: str) -> str:
+        return f"{BROADCAST_PREFIX}:{channel}"
+
+    def register(self, channel: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        self.handlers[self.channel_name(channel)] = handler
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        await self.redis.publish(self.channel_name(channel), json.dumps(message))
+
+    def deliver(self, channel: str, message: Dict[str, Any]) -> None:
+        handler = self.handlers.get(channel)
+        if handler is None:
+            return
+        # deliver in the background so a slow websocket never stalls the subscription
+        task = asyncio.create_task(handler(message))
+        self.delivery_tasks.add(task)
+        task.add_done_callback(self.delivery_tasks.discard)
+
+    async def listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(*self.handlers.keys())
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self.deliver(channel, json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Broadcast listener disconnected, retrying", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+broadcaster = Broadcaster(redis=redis)
@@ -1,8 +1,23 @@
-from typing import Optional
+import asyncio
+import inspect
+import json
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from collections import OrderedDict
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type
 from typing_extensions import override
+from fastapi import Response
 from redis import asyncio as aioredis
 from fastapi_cache import FastAPICache
-from .variables import REDIS_URL
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.coder import Coder, JsonCoder
+from .variables import CACHE_L1_MAX_ENTRIES, CACHE_L1_TTL, REDIS_URL
+
+logger = logging.getLogger(__name__)
 
 redis = aioredis.from_url(
     url=REDIS_URL,
@@ -11,12 +26,238 @@ redis = aioredis.from_url(
 )
 
 REDIS_PREFIX = 'anteiku-kohi-cache'
+CACHE_INVALIDATION_CHANNEL = f"{REDIS_PREFIX}:invalidation"
+NAMESPACE_VERSION_PREFIX = f"{REDIS_PREFIX}:namespace_version"
+SWEEP_BATCH_SIZE = 500
+
+# KEYS[1]: namespace version key, ARGV[1]: namespace prefix, ARGV[2]: key suffix
+VERSIONED_READ_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local key = ARGV[1] .. ':v' .. version .. ':' .. ARGV[2]
+return {version, redis.call('TTL', key), redis.call('GET', key)}
+"""
+
+# KEYS[1]: namespace version key, ARGV[1]: namespace prefix, ARGV[2]: key suffix, ARGV[3]: value, ARGV[4]: expire
+VERSIONED_WRITE_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local key = ARGV[1] .. ':v' .. version .. ':' .. ARGV[2]
+if tonumber(ARGV[4]) > 0 then
+    redis.call('SET', key, ARGV[3], 'EX', ARGV[4])
+else
+    redis.call('SET', key, ARGV[3])
+end
+return version
+"""
+
+# version observed by the last versioned read in this request, reused by the write that follows a miss
+read_version: ContextVar[Optional[Tuple[str, str]]] = ContextVar("read_version", default=None)
 
 class RedisNamespace:
     MEAL_LIST = "meal_list"
     MEAL = "meal"
     USER = "user"
     PAYMENT_URL = "payment_url"
+    ORDER = "order"
+    ACTIVE_USER = "active_user"
+
+
+class LocalCache:
+    max_entries: int
+    entries: "OrderedDict[str, Tuple[float, bytes]]"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[Tuple[int, bytes]]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return int(remaining), value
+
+    def set(self, key: str, value: bytes, expire: int) -> None:
+        if expire <= 0:
+            return
+        self.entries[key] = (time.monotonic() + expire, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self.entries.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            del self.entries[key]
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+class VersionedRedisBackend(RedisBackend):
+    version_keys: Dict[str, str]
+    sweep_tasks: Set["asyncio.Task[None]"]
+
+    def __init__(self, redis: "aioredis.Redis", versioned_namespaces: Iterable[str]):
+        super().__init__(redis)
+        self.version_keys = {
+            f"{REDIS_PREFIX}:{namespace}": f"{NAMESPACE_VERSION_PREFIX}:{namespace}"
+            for namespace in versioned_namespaces
+        }
+        self.read_script = redis.register_script(VERSIONED_READ_SCRIPT)
+        self.write_script = redis.register_script(VERSIONED_WRITE_SCRIPT)
+        self.sweep_tasks = set()
+
+    def split_versioned_key(self, key: str) -> Optional[Tuple[str, str]]:
+        for prefix in self.version_keys:
+            if key.startswith(prefix + ":"):
+                return prefix, key[len(prefix) + 1:]
+        return None
+
+    @override
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        parts = self.split_versioned_key(key)
+        if parts is None:
+            return await super().get_with_ttl(key)
+        prefix, suffix = parts
+        version, ttl, value = await self.read_script(keys=[self.version_keys[prefix]], args=[prefix, suffix])
+        read_version.set((key, version.decode() if isinstance(version, bytes) else str(version)))
+        return int(ttl), value
+
+    @override
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        parts = self.split_versioned_key(key)
+        if parts is None:
+            return await super().set(key, value, expire)
+        prefix, suffix = parts
+        observed = read_version.get()
+        if observed is not None and observed[0] == key:
+            await self.redis.set(f"{prefix}:v{observed[1]}:{suffix}", value, ex=expire)
+            return
+        await self.write_script(keys=[self.version_keys[prefix]], args=[prefix, suffix, value, expire or 0])
+
+    @override
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if namespace:
+            version_key = self.version_keys.get(namespace)
+            if version_key is None:
+                return await self.sweep(match=f"{namespace}:*")
+            version = await self.redis.incr(version_key)
+            task = asyncio.create_task(self.sweep(match=f"{namespace}:v*", keep_prefix=f"{namespace}:v{version}:"))
+            self.sweep_tasks.add(task)
+            task.add_done_callback(self.sweep_tasks.discard)
+            return 1
+        elif key:
+            parts = self.split_versioned_key(key)
+            if parts is None:
+                return await super().clear(key=key)
+            prefix, suffix = parts
+            version = await self.redis.get(self.version_keys[prefix])
+            return await self.redis.unlink(f"{prefix}:v{(version or b'0').decode()}:{suffix}")
+        return 0
+
+    async def sweep(self, match: str, keep_prefix: Optional[str] = None) -> int:
+        deleted = 0
+        batch: List[bytes] = []
+        async for cache_key in self.redis.scan_iter(match=match, count=SWEEP_BATCH_SIZE):
+            if keep_prefix is not None and cache_key.decode().startswith(keep_prefix):
+                continue
+            batch.append(cache_key)
+            if len(batch) >= SWEEP_BATCH_SIZE:
+                deleted += await self.redis.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += await self.redis.unlink(*batch)
+        return deleted
+
+
+class TwoTierBackend(VersionedRedisBackend):
+    local_cache: LocalCache
+    local_ttl: int
+    local_prefixes: Tuple[str, ...]
+
+    def __init__(
+        self,
+        redis: "aioredis.Redis",
+        versioned_namespaces: Iterable[str],
+        local_namespaces: Iterable[str],
+        max_entries: int,
+        local_ttl: int,
+    ):
+        super().__init__(redis, versioned_namespaces=versioned_namespaces)
+        self.local_cache = LocalCache(max_entries=max_entries)
+        self.local_ttl = local_ttl
+        self.local_prefixes = tuple(f"{REDIS_PREFIX}:{namespace}:" for namespace in local_namespaces)
+
+    def is_local(self, key: str) -> bool:
+        return key.startswith(self.local_prefixes)
+
+    @override
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        if not self.is_local(key):
+            return await super().get_with_ttl(key)
+        hit = self.local_cache.get(key)
+        if hit is not None:
+            return hit
+        ttl, value = await super().get_with_ttl(key)
+        if value is not None:
+            self.local_cache.set(key, value, min(ttl, self.local_ttl) if ttl > 0 else self.local_ttl)
+        return ttl, value
+
+    @override
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        await super().set(key, value, expire)
+        # a write can lose to a newer one in redis, so L1 is only filled from what a read returns
+        if self.is_local(key):
+            self.local_cache.delete(key)
+
+    @override
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        result = await super().clear(namespace, key)
+        self.evict(namespace=namespace, key=key)
+        await self.redis.publish(CACHE_INVALIDATION_CHANNEL, json.dumps({ "namespace": namespace, "key": key }))
+        return result
+
+    def evict(self, namespace: Optional[str] = None, key: Optional[str] = None) -> None:
+        if namespace:
+            self.local_cache.delete_prefix(namespace + ":")
+        elif key:
+            self.local_cache.delete(key)
+
+    async def listen_for_invalidation(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                # invalidations published while disconnected are lost, so start from an empty L1
+                self.local_cache.clear()
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    payload = json.loads(message["data"])
+                    self.evict(namespace=payload.get("namespace"), key=payload.get("key"))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Cache invalidation listener disconnected, retrying", exc_info=True)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+
+
+cache_backend = TwoTierBackend(
+    redis=redis,
+    versioned_namespaces=(RedisNamespace.MEAL_LIST,),
+    local_namespaces=(RedisNamespace.MEAL, RedisNamespace.MEAL_LIST, RedisNamespace.ACTIVE_USER),
+    max_entries=CACHE_L1_MAX_ENTRIES,
+    local_ttl=CACHE_L1_TTL,
+)
 
 
 class FastAPICacheExtended(FastAPICache):
@@ -31,3 +272,326 @@ class FastAPICacheExtended(FastAPICache):
         if namespace and namespace.strip() != "":
             namespace = cls._prefix + ":" + namespace
         return await cls._backend.clear(namespace, key)
+
+
+CACHE_LOCK_PREFIX = f"{REDIS_PREFIX}:lock"
+CACHE_GENERATION_PREFIX = f"{REDIS_PREFIX}:generation"
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_POLL_INTERVAL = 0.05
+CACHE_RESPONSE_PARAM = "cache_response"
+SOFT_EXPIRE_RATIO = 0.9
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# KEYS[1]: cache key, KEYS[2]: generation key, ARGV[1]: generation seen before computing, ARGV[2]: value, ARGV[3]: expire
+GENERATION_WRITE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+# KEYS[1]: cache key, KEYS[2]: generation key, KEYS[3]: source version key
+# ARGV[1]: generation expire, ARGV[2]: encoded envelope or '' to only delete, ARGV[3]: expire, ARGV[4]: source version or ''
+INVALIDATE_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+if ARGV[2] == '' then
+    return redis.call('UNLINK', KEYS[1])
+end
+if ARGV[4] ~= '' then
+    local current = redis.call('GET', KEYS[3])
+    if current and tonumber(current) > tonumber(ARGV[4]) then
+        -- a newer write already landed, keep it
+        return 0
+    end
+    redis.call('SET', KEYS[3], ARGV[4], 'EX', ARGV[1])
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+release_lock_script = redis.register_script(RELEASE_LOCK_SCRIPT)
+generation_write_script = redis.register_script(GENERATION_WRITE_SCRIPT)
+invalidate_script = redis.register_script(INVALIDATE_SCRIPT)
+
+# cache keys being recomputed by this worker, awaited by concurrent requests for the same key
+inflight: Dict[str, "asyncio.Future[Any]"] = {}
+# strong references so pending soft-expiry refreshes are not garbage collected
+refresh_tasks: Set["asyncio.Task[Any]"] = set()
+# refreshes started while handling the current request, they may still use its resources after the response
+request_refreshes: ContextVar[Optional[Set["asyncio.Task[Any]"]]] = ContextVar("request_refreshes", default=None)
+
+class CacheEnvelope:
+    FRESH_UNTIL: str = "fresh_until"
+    VALUE: str = "value"
+
+async def read_envelope(cache_key: str, coder: Type[Coder]) -> Optional[Dict[str, Any]]:
+    try:
+        _, cached = await FastAPICache.get_backend().get_with_ttl(cache_key)
+    except Exception:
+        logger.warning(f"Error retrieving cache key '{cache_key}' from backend", exc_info=True)
+        return None
+    if cached is None:
+        return None
+    envelope = coder.decode(cached)
+    if not isinstance(envelope, dict) or CacheEnvelope.FRESH_UNTIL not in envelope:
+        return None
+    return envelope
+
+async def write_envelope(
+    cache_key: str,
+    coder: Type[Coder],
+    value: Any,
+    expire: int,
+    soft_expire: int,
+    generation: Optional[str] = None,
+) -> None:
+    envelope = { CacheEnvelope.FRESH_UNTIL: time.time() + soft_expire, CacheEnvelope.VALUE: value }
+    try:
+        if generation is None:
+            await FastAPICache.get_backend().set(cache_key, coder.encode(envelope), expire)
+            return
+        await set_if_generation(cache_key, generation, coder.encode(envelope), expire)
+    except Exception:
+        logger.warning(f"Error setting cache key '{cache_key}' in backend", exc_info=True)
+
+async def set_if_generation(cache_key: str, generation: str, value: bytes, expire: int) -> bool:
+    # dropped when the key was invalidated while the value was being computed
+    return bool(await generation_write_script(
+        keys=[cache_key, f"{CACHE_GENERATION_PREFIX}:{cache_key}"],
+        args=[generation, value, expire],
+    ))
+
+async def read_generation(cache_key: str) -> Optional[str]:
+    try:
+        generation = await redis.get(f"{CACHE_GENERATION_PREFIX}:{cache_key}")
+    except Exception:
+        logger.warning(f"Error reading cache generation of '{cache_key}'", exc_info=True)
+        return None
+    return generation.decode() if generation is not None else "0"
+
+async def run_invalidate_script(cache_key: str, expire: int, encoded: bytes = b"", version: Optional[float] = None) -> None:
+    # expire must cover the cached value's lifetime so the generation never resets under a pending write
+    try:
+        await invalidate_script(
+            keys=[cache_key, f"{CACHE_GENERATION_PREFIX}:{cache_key}", f"{CACHE_GENERATION_PREFIX}:{cache_key}:version"],
+            args=[expire, encoded, expire, "" if version is None else repr(version)],
+        )
+    except Exception:
+        logger.warning(f"Error invalidating cache key '{cache_key}'", exc_info=True)
+
+async def invalidate(namespace: str, key: str, expire: int) -> None:
+    await run_invalidate_script(":".join([REDIS_PREFIX, namespace, key]), expire)
+
+async def write_through(
+    namespace: str,
+    key: str,
+    value: Any,
+    expire: int,
+    version: Optional[float] = None,
+    soft_expire: Optional[int] = None,
+    coder: Type[Coder] = JsonCoder,
+) -> None:
+    # bumps the generation like invalidate(), so recomputes that started earlier can't overwrite this value;
+    # version (e.g. updated_at) keeps two write-throughs from landing out of order
+    soft_ttl = soft_expire if soft_expire is not None else int(expire * SOFT_EXPIRE_RATIO)
+    envelope = { CacheEnvelope.FRESH_UNTIL: time.time() + soft_ttl, CacheEnvelope.VALUE: value }
+    await run_invalidate_script(":".join([REDIS_PREFIX, namespace, key]), expire, coder.encode(envelope), version)
+
+async def acquire_lock(lock_key: str, token: str) -> bool:
+    try:
+        return bool(await redis.set(lock_key, token, nx=True, ex=CACHE_LOCK_TIMEOUT))
+    except Exception:
+        logger.warning(f"Error acquiring cache lock '{lock_key}'", exc_info=True)
+        return True
+
+async def release_lock(lock_key: str, token: str) -> None:
+    try:
+        await release_lock_script(keys=[lock_key], args=[token])
+    except Exception:
+        logger.warning(f"Error releasing cache lock '{lock_key}'", exc_info=True)
+
+async def compute_with_lock(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    coder: Type[Coder],
+    expire: int,
+    soft_expire: int,
+    stale: Optional[Dict[str, Any]],
+    generation_checked: bool = False,
+) -> Any:
+    lock_key = f"{CACHE_LOCK_PREFIX}:{cache_key}"
+    token = uuid.uuid4().hex
+    if not await acquire_lock(lock_key, token):
+        # another worker is recomputing this key
+        if stale is not None:
+            return stale[CacheEnvelope.VALUE]
+        deadline = time.monotonic() + CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(CACHE_LOCK_POLL_INTERVAL)
+            envelope = await read_envelope(cache_key, coder)
+            if envelope is not None and envelope[CacheEnvelope.FRESH_UNTIL] > time.time():
+                return envelope[CacheEnvelope.VALUE]
+            if await acquire_lock(lock_key, token):
+                break
+        else:
+            return await compute()
+    try:
+        generation = await read_generation(cache_key) if generation_checked else None
+        value = await compute()
+        if generation_checked and generation is None:
+            # redis is unreachable, the compare-and-set cannot be trusted
+            return value
+        await write_envelope(cache_key, coder, value, expire, soft_expire, generation)
+        return value
+    finally:
+        await release_lock(lock_key, token)
+
+async def load_single_flight(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    coder: Type[Coder],
+    expire: int,
+    soft_expire: int,
+    stale: Optional[Dict[str, Any]],
+    generation_checked: bool = False,
+) -> Any:
+    while True:
+        future = inflight.get(cache_key)
+        if future is None:
+            break
+        if stale is not None:
+            return stale[CacheEnvelope.VALUE]
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # the request computing the value was cancelled, take over
+            if future.cancelled():
+                continue
+            raise
+    future = asyncio.get_running_loop().create_future()
+    future.add_done_callback(lambda done: done.cancelled() or done.exception())
+    inflight[cache_key] = future
+    try:
+        value = await compute_with_lock(cache_key, compute, coder, expire, soft_expire, stale, generation_checked)
+        future.set_result(value)
+        return value
+    except Exception as exc:
+        future.set_exception(exc)
+        raise
+    except BaseException:
+        future.cancel()
+        raise
+    finally:
+        inflight.pop(cache_key, None)
+
+def finish_refresh(task: "asyncio.Task[Any]") -> None:
+    refresh_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Error refreshing soft-expired cache value", exc_info=task.exception())
+
+def refresh_in_background(
+    cache_key: str,
+    compute: Callable[[], Awaitable[Any]],
+    coder: Type[Coder],
+    expire: int,
+    soft_expire: int,
+    stale: Dict[str, Any],
+    generation_checked: bool = False,
+) -> None:
+    if cache_key in inflight:
+        return
+    # with a stale value at hand, compute_with_lock gives up instead of waiting when another worker holds the lock
+    task = asyncio.create_task(
+        load_single_flight(cache_key, compute, coder, expire, soft_expire, stale, generation_checked)
+    )
+    refresh_tasks.add(task)
+    task.add_done_callback(finish_refresh)
+    pending = request_refreshes.get()
+    if pending is not None:
+        pending.add(task)
+
+async def run_after(tasks: Set["asyncio.Task[Any]"], cleanup: Callable[[], Awaitable[Any]]) -> None:
+    await asyncio.wait(tasks)
+    await cleanup()
+
+def defer_until_refreshed(tasks: Set["asyncio.Task[Any]"], cleanup: Callable[[], Awaitable[Any]]) -> None:
+    task = asyncio.create_task(run_after(set(tasks), cleanup))
+    refresh_tasks.add(task)
+    task.add_done_callback(finish_refresh)
+
+def cache(
+    expire: int,
+    namespace: str = "",
+    coder: Type[Coder] = JsonCoder,
+    key_builder: Optional[Callable[..., str]] = None,
+    soft_expire: Optional[int] = None,
+    generation_checked: bool = False,
+):
+    # generation_checked: the value is only stored if invalidate() was not called while computing it,
+    # the key must not belong to a versioned or local namespace
+    soft_ttl = soft_expire if soft_expire is not None else int(expire * SOFT_EXPIRE_RATIO)
+
+    def wrapper(func: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(func)
+        parameters = [
+            *signature.parameters.values(),
+            inspect.Parameter(CACHE_RESPONSE_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+        ]
+
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            response: Optional[Response] = kwargs.pop(CACHE_RESPONSE_PARAM, None)
+            build_key = key_builder or FastAPICache.get_key_builder()
+            cache_key = build_key(
+                func,
+                f"{FastAPICache.get_prefix()}:{namespace}",
+                request=None,
+                response=response,
+                args=args,
+                kwargs=kwargs,
+            )
+            envelope = await read_envelope(cache_key, coder)
+            if envelope is not None and envelope[CacheEnvelope.FRESH_UNTIL] > time.time():
+                if response:
+                    response.headers["Cache-Control"] = f"max-age={int(envelope[CacheEnvelope.FRESH_UNTIL] - time.time())}"
+                return envelope[CacheEnvelope.VALUE]
+            if envelope is not None:
+                # soft-expired: every caller gets the stale value, one refresh runs off the request path
+                refresh_in_background(
+                    cache_key,
+                    lambda: func(*args, **kwargs),
+                    coder,
+                    expire,
+                    soft_ttl,
+                    envelope,
+                    generation_checked,
+                )
+                if response:
+                    response.headers["Cache-Control"] = "max-age=0"
+                return envelope[CacheEnvelope.VALUE]
+            # miss: one request computes, the others wait for it
+            value = await load_single_flight(
+                cache_key,
+                lambda: func(*args, **kwargs),
+                coder,
+                expire,
+                soft_ttl,
+                envelope,
+                generation_checked,
+            )
+            if response:
+                response.headers["Cache-Control"] = f"max-age={soft_ttl}"
+            return value
+
+        inner.__signature__ = signature.replace(parameters=parameters) # type: ignore
+        return inner
+
+    return wrapper
@@ -1,4 +1,55 @@
-
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, TypeVar
+from fastapi import HTTPException
 from passlib.context import CryptContext
+from starlette import status
+
+from .variables import BCRYPT_ROUNDS, PASSWORD_HASHING_QUEUE_SIZE, PASSWORD_HASHING_WORKERS
+
+T = TypeVar("T")
+
+# hashes with any other cost are flagged by verify_and_update and rehashed on login
+bcrypt_context = CryptContext(
+    schemes=['bcrypt'],
+    deprecated='auto',
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+class PasswordHasher:
+    context: CryptContext
+    executor: ThreadPoolExecutor
+    capacity: int
+    pending: int
+
+    def __init__(self, context: CryptContext, max_workers: int, queue_size: int):
+        self.context = context
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hasher")
+        self.capacity = max_workers + queue_size
+        self.pending = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.capacity:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Hệ thống đang bận, vui lòng thử lại sau")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self.run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self.run(self.context.verify_and_update, password, hashed_password)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
 
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
\ No newline at end of file
+password_hasher = PasswordHasher(
+    context=bcrypt_context,
+    max_workers=PASSWORD_HASHING_WORKERS,
+    queue_size=PASSWORD_HASHING_QUEUE_SIZE,
+)
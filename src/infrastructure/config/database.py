@@ -1,9 +1,30 @@
+import os
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
-from ...infrastructure.config.variables import DATABASE_URL
+from ...infrastructure.config.variables import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PREPARED_STATEMENT_CACHE_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+)
 
-async_engine = create_async_engine(DATABASE_URL)
+async_engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_PREPARED_STATEMENT_CACHE_SIZE,
+    },
+)
 
 AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, autocommit=False, expire_on_commit=False, class_=AsyncSession)
 
@@ -11,4 +32,18 @@ Base = declarative_base()
 
 async def init_db():
     async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+        await conn.run_sync(Base.metadata.create_all)
+
+def get_pool_stats() -> dict:
+    pool = async_engine.sync_engine.pool
+    return {
+        "pid": os.getpid(),
+        "pool_size": pool.size(), # type: ignore
+        "max_overflow": DB_MAX_OVERFLOW,
+        "checked_in": pool.checkedin(), # type: ignore
+        "checked_out": pool.checkedout(), # type: ignore
+        "overflow": pool.overflow(), # type: ignore
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
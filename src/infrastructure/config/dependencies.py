@@ -1,5 +1,6 @@
+import asyncio
 from concurrent.futures import ProcessPoolExecutor
-from typing import List
+from typing import Any, List, Set
 from fastapi import Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
@@ -15,15 +16,23 @@ from ...application.service.user_service import UserService
 from ..repository_impl.user_repository_impl import UserRepositoryImpl
 from ...domain.repository.user_repository import UserRepository
 from ..config.database import AsyncSessionLocal
+from ..config.caching import defer_until_refreshed, request_refreshes
+from ..utils.data_loader import DataLoaderRegistry
 from ...domain.repository.order_repository import OrderRepository
 from ..repository_impl.order_repository_impl import OrderRepositoryImpl
 
 # database session
 async def get_db():
-    async with AsyncSessionLocal() as session:
-        try:
-            yield session
-        finally:
+    refreshes: Set["asyncio.Task[Any]"] = set()
+    request_refreshes.set(refreshes)
+    session = AsyncSessionLocal()
+    try:
+        yield session
+    finally:
+        if refreshes:
+            # a soft-expiry refresh started by this request still runs on the session, close it once that is done
+            defer_until_refreshed(refreshes, session.close)
+        else:
             await session.close()
 
 # process pool executer
@@ -34,15 +43,28 @@ def get_process_executor(request: Request) -> ProcessPoolExecutor:
 def get_redlock_connection_manager(request: Request) -> List[Redis]:
     return request.app.state.redlock_connection_manager
 
+# request-scoped data loaders, shared by every repository resolved in the same request
+def get_data_loader_registry() -> DataLoaderRegistry:
+    return DataLoaderRegistry()
+
 # repository dependecies
-def get_user_repository(async_session: AsyncSession = Depends(get_db)) -> UserRepository:
-    return UserRepositoryImpl(async_session=async_session)
+def get_user_repository(
+    async_session: AsyncSession = Depends(get_db),
+    data_loader_registry: DataLoaderRegistry = Depends(get_data_loader_registry),
+) -> UserRepository:
+    return UserRepositoryImpl(async_session=async_session, data_loader_registry=data_loader_registry)
 
-def get_meal_repository(async_session: AsyncSession = Depends(get_db)) -> MealRepository:
-    return MealRepositoryImpl(async_session=async_session)
+def get_meal_repository(
+    async_session: AsyncSession = Depends(get_db),
+    data_loader_registry: DataLoaderRegistry = Depends(get_data_loader_registry),
+) -> MealRepository:
+    return MealRepositoryImpl(async_session=async_session, data_loader_registry=data_loader_registry)
 
-def get_order_repository(async_session: AsyncSession = Depends(get_db)) -> OrderRepository:
-    return OrderRepositoryImpl(async_session=async_session)
+def get_order_repository(
+    async_session: AsyncSession = Depends(get_db),
+    data_loader_registry: DataLoaderRegistry = Depends(get_data_loader_registry),
+) -> OrderRepository:
+    return OrderRepositoryImpl(async_session=async_session, data_loader_registry=data_loader_registry)
 
 def get_reset_password_code_repository(async_session: AsyncSession = Depends(get_db)) -> ResetPasswordCodeRepository:
     return ResetPasswordCodeRepositoryImpl(async_session=async_session)
@@ -0,0 +1,30 @@
+from pathlib import Path
+from typing import Optional
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from ...infrastructure.config.database import async_engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+def get_alembic_config() -> Config:
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    return config
+
+def get_head_revision() -> Optional[str]:
+    return ScriptDirectory.from_config(get_alembic_config()).get_current_head()
+
+async def get_current_revision() -> Optional[str]:
+    try:
+        async with async_engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return result.scalar_one_or_none()
+    except (DBAPIError, OSError):
+        return None
+
+def run_migrations() -> None:
+    command.upgrade(get_alembic_config(), "head")
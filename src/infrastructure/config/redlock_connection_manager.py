@@ -5,6 +5,7 @@ from .variables import (
     REDLOCK_URL_3
 )
 from redis.asyncio import Redis
+from pottery import AIORedlock
 
 REDLOCK_CONNECTIONS_URL = [
     REDLOCK_URL_1,
@@ -20,3 +21,13 @@ redlock_connection_manager: List[Redis] = [
     )
     for redlock_url in REDLOCK_CONNECTIONS_URL
 ]
+
+# identical pictures share one set of files, so reusing them and deciding they are unused
+# must not interleave; held across image processing, hence the longer release time
+def image_redlock(masters: List[Redis], stem: str) -> AIORedlock:
+    return AIORedlock(
+        masters=masters,
+        key=f"redlock:meal_image:{stem}",
+        context_manager_timeout=10,
+        auto_release_time=30,
+    )
@@ -1,8 +1,19 @@
+import hashlib
+import logging
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Annotated
+from typing import Annotated, Tuple
 from fastapi import Depends, HTTPException, Request, WebSocket, WebSocketException
 from fastapi.security import OAuth2PasswordBearer
 
+from ...infrastructure.config.caching import (
+    REDIS_PREFIX,
+    RedisNamespace,
+    cache_backend,
+    read_generation,
+    run_invalidate_script,
+    set_if_generation,
+)
 from ...infrastructure.config.dependencies import get_user_repository
 
 from ...domain.repository.user_repository import UserRepository
@@ -11,13 +22,62 @@ from ...infrastructure.utils.token_util import TokenClaims, TokenKey
 from jose import JWTError, jwt
 from starlette import status
 
+logger = logging.getLogger(__name__)
+
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl='user/login')
 
+WEBSOCKET_CLAIMS_CACHE_SIZE = 4096
+
+# sha256(token) -> (expires, claims), lets reconnecting clients skip the jwt decode
+websocket_claims_cache: "OrderedDict[str, Tuple[float, TokenClaims]]" = OrderedDict()
+
+ACTIVE_USER_CACHE_EXPIRE = 60 * 5
+ACTIVE_USER_CACHE_VALUE = b"1"
+
+def active_user_key(user_id: int) -> str:
+    return ":".join([REDIS_PREFIX, RedisNamespace.ACTIVE_USER, str(user_id)])
+
+async def is_active_user(user_id: int, user_repository: UserRepository) -> bool:
+    key = active_user_key(user_id=user_id)
+    try:
+        _, cached = await cache_backend.get_with_ttl(key)
+    except Exception:
+        cached = None
+    if cached is not None:
+        return True
+    # read before the database so a logout or deactivation committed in between makes the write below a no-op
+    generation = await read_generation(key)
+    user_entity = await user_repository.get_by_id(id=user_id)
+    if user_entity is None or not user_entity.is_active or user_entity.refresh_token is None:
+        return False
+    if generation is not None:
+        try:
+            await set_if_generation(key, generation, ACTIVE_USER_CACHE_VALUE, ACTIVE_USER_CACHE_EXPIRE)
+        except Exception:
+            pass
+    return True
+
+async def revoke_active_user(user_id: int) -> None:
+    # evicts the entry in redis and, through the invalidation channel, in every worker
+    key = active_user_key(user_id=user_id)
+    # bumping the generation rejects cache fills by checks that read the user before this commit
+    await run_invalidate_script(key, ACTIVE_USER_CACHE_EXPIRE)
+    try:
+        await cache_backend.clear(key=key)
+    except Exception:
+        # called after the database commit, a cache outage must not turn a successful request into a 500;
+        # other workers keep their entry until it expires
+        cache_backend.evict(key=key)
+        logger.error(f"Error revoking active user cache key '{key}'", exc_info=True)
+
 async def verify_access_token(
     request: Request,
     token: Annotated[str, Depends(oauth2_bearer)],
     user_repository: Annotated[UserRepository, Depends(get_user_repository)]
 ) -> TokenClaims:
+    claims: TokenClaims | None = getattr(request.state, "claims", None)
+    if claims is not None:
+        return claims
     try:
         payload = jwt.decode(token=token, key=SECRET_KEY, algorithms=[HASH_ALGORITHM])
         user_id: int | None = payload.get(TokenKey.ID)
@@ -27,7 +87,7 @@ async def verify_access_token(
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Token không hợp lệ')
         if datetime.now(timezone.utc).timestamp() > expires:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Token không hợp lệ')
-        if await user_repository.get_by_id(id=user_id) is None:
+        if not await is_active_user(user_id=user_id, user_repository=user_repository):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Token không hợp lệ')
         claims = TokenClaims(id=user_id, role=user_role)
         request.state.claims = claims
@@ -45,6 +105,15 @@ async def websocket_verify_access_token(
     if len(parts) != 2 or parts[0].lower() != "bearer":
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Token không hợp lệ")
     token = parts[1]
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    now = datetime.now(timezone.utc).timestamp()
+    cached = websocket_claims_cache.get(token_hash)
+    if cached is not None:
+        cached_expires, cached_claims = cached
+        if now <= cached_expires:
+            websocket_claims_cache.move_to_end(token_hash)
+            return cached_claims
+        del websocket_claims_cache[token_hash]
     try:
         payload = jwt.decode(token=token, key=SECRET_KEY, algorithms=[HASH_ALGORITHM])
         user_id: int | None = payload.get(TokenKey.ID)
@@ -52,9 +121,12 @@ async def websocket_verify_access_token(
         user_role: str | None = payload.get(TokenKey.ROLE)
         if user_id is None or user_role is None or expires is None:
             raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Token không hợp lệ")
-        if datetime.now(timezone.utc).timestamp() > expires:
+        if now > expires:
             raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Token không hợp lệ")
         claims = TokenClaims(id=user_id, role=user_role)
+        websocket_claims_cache[token_hash] = (expires, claims)
+        if len(websocket_claims_cache) > WEBSOCKET_CLAIMS_CACHE_SIZE:
+            websocket_claims_cache.popitem(last=False)
         return claims
     except JWTError:
         raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Token không hợp lệ")
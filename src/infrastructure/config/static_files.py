@@ -0,0 +1,104 @@
+import os
+import re
+import stat
+from collections import OrderedDict
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+# names produced by the content-addressed pipeline: {hash}.jpg or {hash}_{size}.{ext}
+HASHED_IMAGE_NAME = re.compile(r"^(?P<stem>[0-9a-f]{32})(?:_(?P<size>\d+))?\.(?P<extension>jpg|webp|avif)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+IMAGE_MEDIA_TYPES = {
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+# most compact first, jpeg is always the fallback
+NEGOTIATED_EXTENSIONS = ("avif", "webp")
+
+KNOWN_NAMES_MAX_ENTRIES = 4096
+
+def accepted_media_types(accept: str) -> set[str]:
+    media_types = set()
+    for media_range in accept.split(","):
+        media_type, *params = [part.strip() for part in media_range.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    pass
+        if quality > 0:
+            media_types.add(media_type.lower())
+    return media_types
+
+def if_none_match(request_headers: Headers) -> set[str]:
+    return {tag.strip() for tag in request_headers.get("if-none-match", "").split(",") if tag.strip()}
+
+class ImmutableStaticFiles(StaticFiles):
+    known_names: "OrderedDict[str, None]"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # names already found on disk, the only ones answered with a 304 without a stat
+        self.known_names = OrderedDict()
+
+    def remember(self, name: str) -> None:
+        self.known_names[name] = None
+        self.known_names.move_to_end(name)
+        if len(self.known_names) > KNOWN_NAMES_MAX_ENTRIES:
+            self.known_names.popitem(last=False)
+
+    def candidate_names(self, name: str, request_headers: Headers) -> list[str]:
+        match = HASHED_IMAGE_NAME.match(name)
+        if match is None or match["extension"] != "jpg":
+            return [name]
+        accepted = accepted_media_types(request_headers.get("accept", ""))
+        suffix = f"_{match['size']}" if match["size"] else ""
+        candidates = [
+            f"{match['stem']}{suffix}.{extension}"
+            for extension in NEGOTIATED_EXTENSIONS
+            if IMAGE_MEDIA_TYPES[extension] in accepted
+        ]
+        candidates.append(name)
+        return candidates
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        directory, name = os.path.split(path)
+        if scope["method"] not in ("GET", "HEAD") or directory or HASHED_IMAGE_NAME.match(name) is None:
+            return await super().get_response(path, scope)
+        request_headers = Headers(scope=scope)
+        client_etags = if_none_match(request_headers)
+        for candidate in self.candidate_names(name, request_headers):
+            headers = {
+                "cache-control": IMMUTABLE_CACHE_CONTROL,
+                # the name is derived from the content, so it is a strong validator on its own
+                "etag": f'"{candidate}"',
+                "vary": "Accept",
+            }
+            if headers["etag"] in client_etags and candidate in self.known_names:
+                # immutable content: answer without touching the disk
+                return NotModifiedResponse(Headers(headers))
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, candidate)
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                continue
+            self.remember(candidate)
+            if headers["etag"] in client_etags:
+                return NotModifiedResponse(Headers(headers))
+            # FileResponse hands the path to the server via the pathsend extension when it is supported
+            return FileResponse(
+                full_path,
+                stat_result=stat_result,
+                headers=headers,
+                media_type=IMAGE_MEDIA_TYPES[os.path.splitext(candidate)[1].lstrip(".")],
+            )
+        return await super().get_response(path, scope)
@@ -23,3 +23,31 @@ VNPAY_HASH_SECRET_KEY: str = str(os.getenv("VNPAY_HASH_SECRET_KEY"))
 
 TARGET_IMAGE_SIZE = 1080
 IMAGE_QUALITY = 85
+IMAGE_VARIANT_SIZES: list[int] = [int(size) for size in os.getenv("IMAGE_VARIANT_SIZES", "160,320,640,1080").split(",")]
+IMAGE_VARIANT_FORMATS: list[str] = os.getenv("IMAGE_VARIANT_FORMATS", "jpeg,webp").split(",")
+
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+
+# "skip": the schema is managed by Alembic (python -m src.migrate), "create_all": create missing tables at startup
+DB_INIT_MODE: str = os.getenv("DB_INIT_MODE", "skip")
+
+CACHE_L1_MAX_ENTRIES: int = int(os.getenv("CACHE_L1_MAX_ENTRIES", "1024"))
+CACHE_L1_TTL: int = int(os.getenv("CACHE_L1_TTL", "30"))
+
+BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASHING_WORKERS: int = int(os.getenv("PASSWORD_HASHING_WORKERS", "4"))
+PASSWORD_HASHING_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASHING_QUEUE_SIZE", "32"))
+
+WEBSOCKET_SEND_TIMEOUT: float = float(os.getenv("WEBSOCKET_SEND_TIMEOUT", "2"))
+WEBSOCKET_QUEUE_SIZE: int = int(os.getenv("WEBSOCKET_QUEUE_SIZE", "64"))
+# "drop_oldest", "coalesce" (keep only the latest message per order) or "disconnect"
+WEBSOCKET_OVERFLOW_POLICY: str = os.getenv("WEBSOCKET_OVERFLOW_POLICY", "coalesce")
+WEBSOCKET_COALESCE_WINDOW: float = float(os.getenv("WEBSOCKET_COALESCE_WINDOW", "0.05"))
+WEBSOCKET_PING_INTERVAL: float = float(os.getenv("WEBSOCKET_PING_INTERVAL", "20"))
+WEBSOCKET_PING_TIMEOUT: float = float(os.getenv("WEBSOCKET_PING_TIMEOUT", "20"))
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+from sqlalchemy import JSON, Boolean, Column, DateTime, Index, Integer, String, func
 from ...infrastructure.config.database import Base
 
 class MealModel(Base):
@@ -12,3 +12,6 @@ class MealModel(Base):
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     image_url = Column(String, nullable=False)
+    image_variants = Column(JSON, nullable=True)
+
+Index("ix_meals_is_available_id", MealModel.is_available, MealModel.id)
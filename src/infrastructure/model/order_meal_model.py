@@ -1,13 +1,18 @@
 from sqlalchemy import Column, DateTime, ForeignKey, Integer, func
+from sqlalchemy.orm import relationship
 from ..config.database import Base
+from .meal_model import MealModel
 
 class OrderMealModel(Base):
     __tablename__ = "order_meal"
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
     meal_id = Column(Integer, ForeignKey("meals.id"), nullable=False)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     price = Column(Integer, nullable=False)
     quantity = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    order = relationship("OrderModel", back_populates="order_meals", lazy="raise")
+    meal = relationship(MealModel, lazy="raise")
@@ -2,7 +2,8 @@ import enum
 import sqlalchemy
 
 from ...infrastructure.config.database import Base
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, func
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, func
+from sqlalchemy.orm import relationship
 
 class OrderStatus(str, enum.Enum):
     ONQUEUE = "ONQUEUE"
@@ -25,3 +26,14 @@ class OrderModel(Base):
     payment_status = Column(sqlalchemy.Enum(PaymentStatus), default=PaymentStatus.PENDING, nullable=False)
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    order_meals = relationship("OrderMealModel", back_populates="order", lazy="raise")
+
+Index("ix_orders_created_at_id", OrderModel.created_at.desc(), OrderModel.id.desc())
+Index(
+    "ix_orders_unassigned_created_at_id",
+    OrderModel.created_at.desc(),
+    OrderModel.id.desc(),
+    postgresql_where=OrderModel.staff_id.is_(None),
+)
+Index("ix_orders_staff_id", OrderModel.staff_id)
@@ -1,6 +1,6 @@
 import enum
 import sqlalchemy
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, func
 from ...infrastructure.config.database import Base
 
 class UserRole(str, enum.Enum):
@@ -22,3 +22,9 @@ class UserModel(Base):
     refresh_token = Column(String, nullable=True)
     role = Column(sqlalchemy.Enum(UserRole), nullable=False, default=UserRole.STAFF)
     is_verified = Column(Boolean, nullable=False, default=False)
+
+Index(
+    "ix_users_refresh_token",
+    UserModel.refresh_token,
+    postgresql_where=UserModel.refresh_token.isnot(None),
+)
@@ -1,24 +1,36 @@
-from typing import Optional
+from typing import Iterable, Optional
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import Integer, Select, any_, func, literal, select
 
+from ...infrastructure.utils.data_loader import DataLoader, DataLoaderRegistry
 from ...infrastructure.model.meal_model import MealModel
 from ...domain.entity.meal_entity import MealEntity
 from ...domain.repository.meal_repository import MealRepository
 
+# shared with benchmarks/explain_indexes.py so the plans checked there are the ones the api runs
+def meal_list_query(page: int, size: int, is_available: bool | None, after_id: Optional[int] = None) -> Select:
+    query = select(MealModel).order_by(MealModel.id)
+    if is_available is not None:
+        query = query.where(MealModel.is_available == is_available)
+    if after_id is not None:
+        return query.where(MealModel.id > after_id).limit(size)
+    return query.offset((page - 1) * size).limit(size)
+
 class MealRepositoryImpl(MealRepository):
     async_session: AsyncSession
+    meal_loader: DataLoader[int, MealEntity]
 
-    def __init__(self, async_session: AsyncSession):
+    def __init__(self, async_session: AsyncSession, data_loader_registry: Optional[DataLoaderRegistry] = None):
         self.async_session = async_session
+        self.meal_loader = (data_loader_registry or DataLoaderRegistry()).get_or_create(
+            name=MealModel.__tablename__,
+            batch_load_fn=self.find_by_ids,
+        )
 
-    async def get_list(self, page: int, size: int, is_available: bool | None) -> list[MealEntity]:
+    async def get_list(self, page: int, size: int, is_available: bool | None, after_id: Optional[int] = None) -> list[MealEntity]:
         async with self.async_session as session:
-            query = select(MealModel)
-            if is_available is not None:
-                query = query.where(MealModel.is_available == is_available)
-            query = query.offset((page - 1) * size).limit(size)
-            result = await session.execute(query)
+            result = await session.execute(meal_list_query(page, size, is_available, after_id))
             meals = list(result.scalars())
             return [
                 MealEntity(
@@ -29,28 +41,39 @@ class MealRepositoryImpl(MealRepository):
                     updated_at=meal_model.updated_at, # type: ignore
                     is_available=meal_model.is_available, # type: ignore
                     price=meal_model.price, # type: ignore
-                    image_url=meal_model.image_url # type: ignore
+                    image_url=meal_model.image_url, # type: ignore
+                    image_variants=meal_model.image_variants, # type: ignore
                 )
                 for meal_model in meals
             ]
 
     async def get_by_id(self, id: int) -> Optional[MealEntity]:
+        return await self.meal_loader.load(id)
+
+    async def get_by_ids(self, ids: Iterable[int]) -> dict[int, MealEntity]:
+        return await self.meal_loader.load_many(ids)
+
+    async def find_by_ids(self, ids: list[int]) -> dict[int, MealEntity]:
+        unique_ids = list(set(ids))
+        if not unique_ids:
+            return {}
         async with self.async_session as session:
-            query = select(MealModel).where(MealModel.id == id)
+            query = select(MealModel).where(MealModel.id == any_(literal(unique_ids, ARRAY(Integer))))
             result = await session.execute(query)
-            meal_model = result.scalar_one_or_none()
-            if not meal_model:
-                return None
-            return MealEntity(
-                id=meal_model.id, # type: ignore
-                name=meal_model.name, # type: ignore
-                description=meal_model.description, # type: ignore
-                created_at=meal_model.created_at, # type: ignore
-                updated_at=meal_model.updated_at, # type: ignore
-                is_available=meal_model.is_available, # type: ignore
-                price=meal_model.price, # type: ignore
-                image_url=meal_model.image_url # type: ignore
-            )
+            return {
+                meal_model.id: MealEntity( # type: ignore
+                    id=meal_model.id, # type: ignore
+                    name=meal_model.name, # type: ignore
+                    description=meal_model.description, # type: ignore
+                    created_at=meal_model.created_at, # type: ignore
+                    updated_at=meal_model.updated_at, # type: ignore
+                    is_available=meal_model.is_available, # type: ignore
+                    price=meal_model.price, # type: ignore
+                    image_url=meal_model.image_url, # type: ignore
+                    image_variants=meal_model.image_variants, # type: ignore
+                )
+                for meal_model in result.scalars()
+            }
 
     async def update(self, meal_entity: MealEntity) -> Optional[MealEntity]:
         async with self.async_session as session:
@@ -63,13 +86,15 @@ class MealRepositoryImpl(MealRepository):
                 result = await session.execute(query)
                 meal_model = result.scalar_one_or_none()
                 if not meal_model:
+                    self.meal_loader.clear(meal_entity.id)
                     return None
                 meal_model.name = meal_entity.name # type: ignore
                 meal_model.description = meal_entity.description # type: ignore
                 meal_model.price = meal_entity.price # type: ignore
                 meal_model.image_url = meal_entity.image_url # type: ignore
+                meal_model.image_variants = meal_entity.image_variants # type: ignore
                 await session.refresh(meal_model)
-                return MealEntity(
+                updated_meal = MealEntity(
                     id=meal_model.id, # type: ignore
                     name=meal_model.name, # type: ignore
                     description=meal_model.description, # type: ignore
@@ -77,22 +102,33 @@ class MealRepositoryImpl(MealRepository):
                     updated_at=meal_model.updated_at, # type: ignore
                     is_available=meal_model.is_available, # type: ignore
                     price=meal_model.price, # type: ignore
-                    image_url=meal_model.image_url # type: ignore
+                    image_url=meal_model.image_url, # type: ignore
+                    image_variants=meal_model.image_variants, # type: ignore
                 )
+                self.meal_loader.prime(updated_meal.id, updated_meal)
+                return updated_meal
 
-    async def create(self, name: str, description: str, price: int, image_url: str) -> MealEntity:
+    async def create(
+        self,
+        name: str,
+        description: str,
+        price: int,
+        image_url: str,
+        image_variants: Optional[dict[str, dict[str, str]]] = None,
+    ) -> MealEntity:
         meal_model = MealModel(
             name=name,
             description=description,
             price=price,
-            image_url=image_url
+            image_url=image_url,
+            image_variants=image_variants,
         )
         async with self.async_session as session:
             async with session.begin():
                 session.add(meal_model)
                 await session.flush()
                 await session.refresh(meal_model)
-                return MealEntity(
+                created_meal = MealEntity(
                     id=meal_model.id, # type: ignore
                     name=meal_model.name, # type: ignore
                     description=meal_model.description, # type: ignore
@@ -100,10 +136,14 @@ class MealRepositoryImpl(MealRepository):
                     updated_at=meal_model.updated_at, # type: ignore
                     is_available=meal_model.is_available, # type: ignore
                     price=meal_model.price, # type: ignore
-                    image_url=meal_model.image_url # type: ignore
+                    image_url=meal_model.image_url, # type: ignore
+                    image_variants=meal_model.image_variants, # type: ignore
                 )
+                self.meal_loader.prime(created_meal.id, created_meal)
+                return created_meal
 
     async def deactivate(self, id: int) -> bool:
+        self.meal_loader.clear(id)
         async with self.async_session as session:
             async with session.begin():
                 query=(
@@ -120,6 +160,7 @@ class MealRepositoryImpl(MealRepository):
                 return meal_model.is_available == False # type: ignore
 
     async def activate(self, id: int) -> bool:
+        self.meal_loader.clear(id)
         async with self.async_session as session:
             async with session.begin():
                 query=(
@@ -134,3 +175,12 @@ class MealRepositoryImpl(MealRepository):
                 meal_model.is_available = True # type: ignore
                 await session.refresh(meal_model)
                 return meal_model.is_available == True # type: ignore
+
+    async def count_by_image_url(self, image_url: str) -> int:
+        async with self.async_session as session:
+            result = await session.execute(
+                select(func.count())
+                .select_from(MealModel)
+                .where(MealModel.image_url == image_url)
+            )
+            return result.scalar_one()
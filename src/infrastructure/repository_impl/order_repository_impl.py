@@ -1,60 +1,135 @@
-from typing import List, Optional
-from sqlalchemy import select, update
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import Integer, Select, any_, insert, inspect, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import selectinload
 
+from ...infrastructure.utils.data_loader import DataLoader, DataLoaderRegistry
+from ...infrastructure.model.meal_model import MealModel
 from ...infrastructure.model.order_meal_model import OrderMealModel
 
 from ...infrastructure.model.order_model import OrderModel, OrderStatus
 
+from ...domain.entity.meal_entity import MealEntity
 from ...domain.entity.order_meal_entity import OrderMealEntity
 from ...domain.entity.order_entity import OrderEntity
 from ...domain.repository.order_repository import OrderRepository
 
 
+# shared with benchmarks/explain_indexes.py so the plans checked there are the ones the api runs
+def order_list_query(
+    page: int,
+    size: int,
+    is_order_responsible: bool | None,
+    after_created_at: Optional[datetime] = None,
+    after_id: Optional[int] = None,
+) -> Select:
+    stmt = (
+        select(OrderModel)
+        .options(
+            selectinload(OrderModel.order_meals)
+            .selectinload(OrderMealModel.meal)
+        )
+        .order_by(OrderModel.created_at.desc(), OrderModel.id.desc())
+    )
+    if is_order_responsible is True:
+        stmt = stmt.where(OrderModel.staff_id == None)
+    elif is_order_responsible is False:
+        stmt = stmt.where(OrderModel.staff_id != None)
+    if after_created_at is not None and after_id is not None:
+        return stmt.where(
+            tuple_(OrderModel.created_at, OrderModel.id) < tuple_(after_created_at, after_id)
+        ).limit(size)
+    return stmt.offset((page - 1) * size).limit(size)
+
+def order_meals_query(order_id: int) -> Select:
+    return select(OrderMealModel).where(OrderMealModel.order_id == order_id)
+
+def _to_meal_entity(meal_model: MealModel) -> MealEntity:
+    return MealEntity(
+        id=meal_model.id, # type: ignore
+        name=meal_model.name, # type: ignore
+        description=meal_model.description, # type: ignore
+        created_at=meal_model.created_at, # type: ignore
+        updated_at=meal_model.updated_at, # type: ignore
+        is_available=meal_model.is_available, # type: ignore
+        price=meal_model.price, # type: ignore
+        image_url=meal_model.image_url, # type: ignore
+        image_variants=meal_model.image_variants, # type: ignore
+    )
+
+def _to_order_meal_entity(order_meal_model: OrderMealModel) -> OrderMealEntity:
+    meal_model = None
+    if "meal" not in inspect(order_meal_model).unloaded:
+        meal_model = order_meal_model.meal
+    return OrderMealEntity(
+        id=order_meal_model.id, # type: ignore
+        order_id=order_meal_model.order_id, # type: ignore
+        meal_id=order_meal_model.meal_id, # type: ignore
+        price=order_meal_model.price, # type: ignore
+        quantity=order_meal_model.quantity, # type: ignore
+        created_at=order_meal_model.created_at, # type: ignore
+        updated_at=order_meal_model.updated_at, # type: ignore
+        meal=_to_meal_entity(meal_model) if meal_model is not None else None,
+    )
+
 class OrderRepositoryImpl(OrderRepository):
     async_session: AsyncSession
+    order_loader: DataLoader[int, OrderEntity]
 
-    def __init__(self, async_session: AsyncSession):
+    def __init__(self, async_session: AsyncSession, data_loader_registry: Optional[DataLoaderRegistry] = None):
         self.async_session = async_session
+        self.order_loader = (data_loader_registry or DataLoaderRegistry()).get_or_create(
+            name=OrderModel.__tablename__,
+            batch_load_fn=self.find_orders_by_ids,
+        )
 
     async def create_order(self, meals: List[OrderMealEntity]) -> OrderEntity:
         async with self.async_session as session:
             async with session.begin():
-                new_order_model = OrderModel()
-                session.add(new_order_model)
-                await session.flush()
-                await session.refresh(new_order_model)
-                new_order_meal_models = []
-                for meal in meals:
-                    new_order_meal_model = OrderMealModel(
-                        order_id=new_order_model.id,
-                        meal_id=meal.meal_id,
-                        price=meal.price,
-                        quantity=meal.quantity,
-                    )
-                    session.add(new_order_meal_model)
-                    new_order_meal_models.append(new_order_meal_model)
-                await session.flush()
-                for new_order_meal_model in new_order_meal_models:
-                    await session.refresh(new_order_meal_model)
-                return OrderEntity(
+                order_result = await session.execute(
+                    insert(OrderModel)
+                    .returning(OrderModel)
+                )
+                new_order_model = order_result.scalar_one()
+                order_meal_result = await session.execute(
+                    insert(OrderMealModel)
+                    .values([
+                        {
+                            "order_id": new_order_model.id,
+                            "meal_id": meal.meal_id,
+                            "price": meal.price,
+                            "quantity": meal.quantity,
+                        }
+                        for meal in meals
+                    ])
+                    .returning(OrderMealModel)
+                )
+                new_order_meal_models = order_meal_result.scalars().all()
+                new_order = OrderEntity(
                     id=new_order_model.id, # type: ignore
                     meals=[
-                        new_order_model.id
+                        new_order_meal_model.meal_id
                         for new_order_meal_model in new_order_meal_models
                     ], # type: ignore
                     order_status=new_order_model.order_status, # type: ignore
                     created_at=new_order_model.created_at, # type: ignore
                     updated_at=new_order_model.updated_at, # type: ignore
                     payment_status=new_order_model.payment_status, # type: ignore
+                    staff_id=new_order_model.staff_id, # type: ignore
+                    order_meals=[
+                        _to_order_meal_entity(new_order_meal_model)
+                        for new_order_meal_model in new_order_meal_models
+                    ],
                 )
+                self.order_loader.prime(new_order.id, new_order)
+                return new_order
 
     async def get_order_meal_list(self, order_id: int) -> List[OrderMealEntity]:
         async with self.async_session as session:
             async with session.begin():
-                order_meal_models = await session.execute(
-                    select(OrderMealModel).where(OrderMealModel.order_id == order_id)
-                )
+                order_meal_models = await session.execute(order_meals_query(order_id))
                 return [
                     OrderMealEntity(
                         id=order_meal_model.id, # type: ignore
@@ -79,6 +154,7 @@ class OrderRepositoryImpl(OrderRepository):
                 result = await session.execute(select_stmt)
                 existed_order_model = result.scalar_one_or_none()
                 if existed_order_model is None:
+                    self.order_loader.clear(order_id)
                     return None
                 update_stmt = (
                     update(OrderModel)
@@ -90,12 +166,10 @@ class OrderRepositoryImpl(OrderRepository):
                 updated_order_model = result.scalar_one_or_none()
                 if updated_order_model is None:
                     return None
-                order_meals = await session.execute(
-                    select(OrderMealModel)
-                    .where(OrderMealModel.order_id == order_id)
-                )
-                meal_ids = [meal.meal_id for meal in order_meals.scalars()]
-                return OrderEntity(
+                order_meals = await session.execute(order_meals_query(order_id))
+                order_meal_models = list(order_meals.scalars())
+                meal_ids = [meal.meal_id for meal in order_meal_models]
+                updated_order = OrderEntity(
                     id=updated_order_model.id, # type: ignore
                     meals=meal_ids, # type: ignore
                     updated_at=updated_order_model.updated_at, # type: ignore
@@ -103,9 +177,13 @@ class OrderRepositoryImpl(OrderRepository):
                     order_status=updated_order_model.order_status, # type: ignore
                     payment_status=updated_order_model.payment_status, # type: ignore
                     staff_id=updated_order_model.staff_id, # type: ignore
+                    order_meals=[_to_order_meal_entity(order_meal_model) for order_meal_model in order_meal_models],
                 )
+                self.order_loader.prime(updated_order.id, updated_order)
+                return updated_order
 
     async def update_order_staff_id(self, order_id: int, staff_id: int) -> bool:
+        self.order_loader.clear(order_id)
         async with self.async_session as session:
             async with session.begin():
                 stmt = (
@@ -133,31 +211,35 @@ class OrderRepositoryImpl(OrderRepository):
                 return updated_order is not None
 
     async def find_order_by_id(self, order_id: int) -> Optional[OrderEntity]:
+        return await self.order_loader.load(order_id)
+
+    async def find_orders_by_ids(self, order_ids: List[int]) -> Dict[int, OrderEntity]:
         async with self.async_session as session:
             stmt = (
                 select(OrderModel)
-                .where(OrderModel.id == order_id)
+                .options(selectinload(OrderModel.order_meals))
+                .where(OrderModel.id == any_(literal(order_ids, ARRAY(Integer))))
             )
             result = await session.execute(stmt)
-            order_model = result.scalar_one_or_none()
-            if order_model is None:
-                return None
-            order_meals = await session.execute(
-                select(OrderMealModel)
-                .where(OrderMealModel.order_id == order_id)
-            )
-            meal_ids = [meal.meal_id for meal in order_meals.scalars()]
-            return OrderEntity(
-                id=order_model.id, # type: ignore
-                meals=meal_ids, # type: ignore
-                updated_at=order_model.updated_at, # type: ignore
-                created_at=order_model.created_at, # type: ignore
-                order_status=order_model.order_status, # type: ignore
-                payment_status=order_model.payment_status, # type: ignore
-                staff_id=order_model.staff_id, # type: ignore
-            )
+            return {
+                order_model.id: OrderEntity( # type: ignore
+                    id=order_model.id, # type: ignore
+                    meals=[order_meal_model.meal_id for order_meal_model in order_model.order_meals], # type: ignore
+                    updated_at=order_model.updated_at, # type: ignore
+                    created_at=order_model.created_at, # type: ignore
+                    order_status=order_model.order_status, # type: ignore
+                    payment_status=order_model.payment_status, # type: ignore
+                    staff_id=order_model.staff_id, # type: ignore
+                    order_meals=[
+                        _to_order_meal_entity(order_meal_model)
+                        for order_meal_model in order_model.order_meals
+                    ],
+                )
+                for order_model in result.scalars().all()
+            }
 
     async def update_order_payment_status(self, order_id: int, status: str) -> None:
+        self.order_loader.clear(order_id)
         async with self.async_session as session:
             async with session.begin():
                 select_statement = (
@@ -173,35 +255,31 @@ class OrderRepositoryImpl(OrderRepository):
                 )
                 await session.execute(update_statement)
 
-    async def find_orders(self, page: int, size: int, is_order_responsible: bool | None) -> List[OrderEntity]:
+    async def find_orders(
+        self,
+        page: int,
+        size: int,
+        is_order_responsible: bool | None,
+        after_created_at: Optional[datetime] = None,
+        after_id: Optional[int] = None,
+    ) -> List[OrderEntity]:
         async with self.async_session as session:
-            stmt = (
-                select(OrderModel)
-                .order_by(OrderModel.created_at.desc())
+            result = await session.execute(
+                order_list_query(page, size, is_order_responsible, after_created_at, after_id)
             )
-            if is_order_responsible is True:
-                stmt = stmt.where(OrderModel.staff_id == None)
-            elif is_order_responsible is False:
-                stmt = stmt.where(OrderModel.staff_id != None)
-            stmt = stmt.offset((page - 1) * size).limit(size)
-            result = await session.execute(stmt)
-            order_models = result.scalars().all()
-            orders = []
-            for order_model in order_models:
-                order_meals = await session.execute(
-                    select(OrderMealModel)
-                    .where(OrderMealModel.order_id == order_model.id)
-                )
-                meal_ids = [meal.meal_id for meal in order_meals.scalars()]
-                orders.append(
-                    OrderEntity(
-                        id=order_model.id, # type: ignore
-                        meals=meal_ids, # type: ignore
-                        updated_at=order_model.updated_at, # type: ignore
-                        created_at=order_model.created_at, # type: ignore
-                        order_status=order_model.order_status, # type: ignore
-                        payment_status=order_model.payment_status, # type: ignore
-                        staff_id=order_model.staff_id, # type: ignore
-                    )
+            return [
+                OrderEntity(
+                    id=order_model.id, # type: ignore
+                    meals=[order_meal_model.meal_id for order_meal_model in order_model.order_meals], # type: ignore
+                    updated_at=order_model.updated_at, # type: ignore
+                    created_at=order_model.created_at, # type: ignore
+                    order_status=order_model.order_status, # type: ignore
+                    payment_status=order_model.payment_status, # type: ignore
+                    staff_id=order_model.staff_id, # type: ignore
+                    order_meals=[
+                        _to_order_meal_entity(order_meal_model)
+                        for order_meal_model in order_model.order_meals
+                    ],
                 )
-            return orders
+                for order_model in result.scalars().all()
+            ]
@@ -1,18 +1,30 @@
 from typing import Optional
 
-from sqlalchemy import select, update
+from sqlalchemy import Integer, Select, any_, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
 from ...domain.entity.user_entity import UserEntity
 from ...domain.repository.user_repository import UserRepository
 from sqlalchemy.ext.asyncio import AsyncSession
 from ...infrastructure.model.user_model import UserModel, UserRole
+from ...infrastructure.utils.data_loader import DataLoader, DataLoaderRegistry
+
+# shared with benchmarks/explain_indexes.py so the plans checked there are the ones the api runs
+def refresh_token_query(refresh_token: str) -> Select:
+    return select(UserModel).where(UserModel.refresh_token == refresh_token)
 
 class UserRepositoryImpl(UserRepository):
     async_session: AsyncSession
+    user_loader: DataLoader[int, UserEntity]
 
-    def __init__(self, async_session: AsyncSession):
+    def __init__(self, async_session: AsyncSession, data_loader_registry: Optional[DataLoaderRegistry] = None):
         self.async_session = async_session
+        self.user_loader = (data_loader_registry or DataLoaderRegistry()).get_or_create(
+            name=UserModel.__tablename__,
+            batch_load_fn=self.find_by_ids,
+        )
 
     async def activate_by_id(self, id: int) -> bool:
+        self.user_loader.clear(id)
         async with self.async_session as session:
             select_stmt = (
                 select(UserModel)
@@ -37,6 +49,7 @@ class UserRepositoryImpl(UserRepository):
             return result.rowcount > 0
 
     async def activate_by_email(self, email: str) -> bool:
+        self.user_loader.clear_all()
         async with self.async_session as session:
             select_stmt = (
                 select(UserModel)
@@ -62,7 +75,7 @@ class UserRepositoryImpl(UserRepository):
 
     async def get_by_refresh_token(self, refresh_token: str) -> Optional[UserEntity]:
         async with self.async_session as session:
-            query = select(UserModel).where(UserModel.refresh_token == refresh_token)
+            query = refresh_token_query(refresh_token)
             query_result = await session.execute(query)
             user_model = query_result.scalar_one_or_none()
             if not user_model:
@@ -83,26 +96,29 @@ class UserRepositoryImpl(UserRepository):
             )
 
     async def get_by_id(self, id: int) -> Optional[UserEntity]:
+        return await self.user_loader.load(id)
+
+    async def find_by_ids(self, ids: list[int]) -> dict[int, UserEntity]:
         async with self.async_session as session:
-            query = select(UserModel).where(UserModel.id == id)
+            query = select(UserModel).where(UserModel.id == any_(literal(ids, ARRAY(Integer))))
             query_result = await session.execute(query)
-            user_model = query_result.scalar_one_or_none()
-            if not user_model:
-                return None
-            return UserEntity(
-                id=user_model.id, # type: ignore
-                full_name=user_model.full_name, # type: ignore
-                phone_number=user_model.phone_number, # type: ignore
-                email=user_model.email, # type: ignore
-                address=user_model.address, # type: ignore
-                updated_at=user_model.updated_at, # type: ignore
-                joined_at=user_model.joined_at, # type: ignore
-                is_active=user_model.is_active, # type: ignore
-                hashed_password=user_model.hashed_password, # type: ignore
-                refresh_token=user_model.refresh_token, # type: ignore
-                role=user_model.role, # type: ignore
-                is_verified=user_model.is_verified # type: ignore
-            )
+            return {
+                user_model.id: UserEntity( # type: ignore
+                    id=user_model.id, # type: ignore
+                    full_name=user_model.full_name, # type: ignore
+                    phone_number=user_model.phone_number, # type: ignore
+                    email=user_model.email, # type: ignore
+                    address=user_model.address, # type: ignore
+                    updated_at=user_model.updated_at, # type: ignore
+                    joined_at=user_model.joined_at, # type: ignore
+                    is_active=user_model.is_active, # type: ignore
+                    hashed_password=user_model.hashed_password, # type: ignore
+                    refresh_token=user_model.refresh_token, # type: ignore
+                    role=user_model.role, # type: ignore
+                    is_verified=user_model.is_verified # type: ignore
+                )
+                for user_model in query_result.scalars()
+            }
 
     async def get_by_email(self, email: str) -> Optional[UserEntity]:
         async with self.async_session as session:
@@ -127,6 +143,7 @@ class UserRepositoryImpl(UserRepository):
             )
 
     async def deactivate_by_id(self, id: int) -> bool:
+        self.user_loader.clear(id)
         async with self.async_session as session:
             select_stmt = (
                 select(UserModel)
@@ -151,6 +168,7 @@ class UserRepositoryImpl(UserRepository):
             return result.rowcount > 0
 
     async def deactivate_by_email(self, email: str) -> bool:
+        self.user_loader.clear_all()
         async with self.async_session as session:
             select_stmt = (
                 select(UserModel)
@@ -187,7 +205,7 @@ class UserRepositoryImpl(UserRepository):
                 session.add(user_model)
                 await session.flush()
                 await session.refresh(user_model)
-                return UserEntity(
+                created_user = UserEntity(
                     id=user_model.id, # type: ignore
                     full_name=user_model.full_name, # type: ignore
                     phone_number=user_model.phone_number, # type: ignore
@@ -201,6 +219,8 @@ class UserRepositoryImpl(UserRepository):
                     role=user_model.role, # type: ignore
                     is_verified=user_model.is_verified # type: ignore
                 )
+                self.user_loader.prime(created_user.id, created_user)
+                return created_user
 
     async def update(self, user_entity: UserEntity) -> Optional[UserEntity]:
         async with self.async_session as session:
@@ -213,6 +233,7 @@ class UserRepositoryImpl(UserRepository):
                 result = await session.execute(select_stmt)
                 user_model = result.scalar_one_or_none()
                 if not user_model:
+                    self.user_loader.clear(user_entity.id)
                     return None
                 update_stmt = (
                     update(UserModel)
@@ -230,8 +251,9 @@ class UserRepositoryImpl(UserRepository):
                 result = await session.execute(update_stmt)
                 user_model = result.scalar_one_or_none()
                 if user_model is None:
+                    self.user_loader.clear(user_entity.id)
                     return None
-                return UserEntity(
+                updated_user = UserEntity(
                     id=user_model.id, # type: ignore
                     full_name=user_model.full_name, # type: ignore
                     phone_number=user_model.phone_number, # type: ignore
@@ -245,3 +267,5 @@ class UserRepositoryImpl(UserRepository):
                     role=user_model.role, # type: ignore
                     is_verified=user_model.is_verified # type: ignore
                 )
+                self.user_loader.prime(updated_user.id, updated_user)
+                return updated_user
@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from fastapi import HTTPException
+from starlette import status
+
+class CursorKey:
+    ID: str = "id"
+    CREATED_AT: str = "created_at"
+
+def _encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Con trỏ phân trang không hợp lệ")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Con trỏ phân trang không hợp lệ")
+    return payload
+
+def encode_order_cursor(created_at: datetime, id: int) -> str:
+    return _encode_cursor({ CursorKey.CREATED_AT: created_at.isoformat(), CursorKey.ID: id })
+
+def decode_order_cursor(cursor: str) -> tuple[datetime, int]:
+    payload = _decode_cursor(cursor)
+    try:
+        return datetime.fromisoformat(payload[CursorKey.CREATED_AT]), int(payload[CursorKey.ID])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Con trỏ phân trang không hợp lệ")
+
+def encode_meal_cursor(id: int) -> str:
+    return _encode_cursor({ CursorKey.ID: id })
+
+def decode_meal_cursor(cursor: str) -> int:
+    payload = _decode_cursor(cursor)
+    try:
+        return int(payload[CursorKey.ID])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Con trỏ phân trang không hợp lệ")
@@ -0,0 +1,98 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+class DataLoader(Generic[K, V]):
+    batch_load_fn: Callable[[List[K]], Awaitable[Dict[K, V]]]
+    cache: Dict[K, "asyncio.Future[Optional[V]]"]
+    queue: List[Tuple[K, "asyncio.Future[Optional[V]]"]]
+    dispatch_task: Optional["asyncio.Task[None]"]
+    dispatch_lock: asyncio.Lock
+
+    def __init__(
+        self,
+        batch_load_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        dispatch_lock: Optional[asyncio.Lock] = None,
+    ):
+        self.batch_load_fn = batch_load_fn
+        self.cache = {}
+        self.queue = []
+        self.dispatch_task = None
+        # loaders sharing one AsyncSession must share this lock, a session can't run two queries at once
+        self.dispatch_lock = dispatch_lock or asyncio.Lock()
+
+    async def load(self, key: K) -> Optional[V]:
+        future = self.cache.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            # callers may be cancelled while shielded, mark the outcome as retrieved so it is never reported
+            future.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self.cache[key] = future
+            self.queue.append((key, future))
+            if len(self.queue) == 1:
+                # batch every load() made in the same event loop iteration into one query
+                loop.call_soon(self.schedule_dispatch)
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> Dict[K, V]:
+        unique_keys = list(dict.fromkeys(keys))
+        values = await asyncio.gather(*(self.load(key) for key in unique_keys))
+        return {
+            key: value
+            for key, value in zip(unique_keys, values)
+            if value is not None
+        }
+
+    def prime(self, key: K, value: Optional[V]) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self.cache[key] = future
+
+    def clear(self, key: K) -> None:
+        self.cache.pop(key, None)
+
+    def clear_all(self) -> None:
+        self.cache.clear()
+
+    def schedule_dispatch(self) -> None:
+        self.dispatch_task = asyncio.ensure_future(self.dispatch())
+
+    async def dispatch(self) -> None:
+        batch, self.queue = self.queue, []
+        if not batch:
+            return
+        try:
+            async with self.dispatch_lock:
+                values = await self.batch_load_fn(list(dict.fromkeys(key for key, _ in batch)))
+        except asyncio.CancelledError:
+            for key, future in batch:
+                if self.cache.get(key) is future:
+                    del self.cache[key]
+                future.cancel()
+            raise
+        except Exception as exc:
+            for key, future in batch:
+                if self.cache.get(key) is future:
+                    del self.cache[key]
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key, future in batch:
+            if not future.done():
+                future.set_result(values.get(key))
+
+class DataLoaderRegistry:
+    loaders: Dict[str, DataLoader[Any, Any]]
+    dispatch_lock: asyncio.Lock
+
+    def __init__(self):
+        self.loaders = {}
+        self.dispatch_lock = asyncio.Lock()
+
+    def get_or_create(self, name: str, batch_load_fn: Callable[[List[Any]], Awaitable[Dict[Any, Any]]]) -> DataLoader[Any, Any]:
+        if name not in self.loaders:
+            self.loaders[name] = DataLoader(batch_load_fn=batch_load_fn, dispatch_lock=self.dispatch_lock)
+        return self.loaders[name]
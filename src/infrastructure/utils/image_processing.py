@@ -1,33 +1,154 @@
-import io
+import hashlib
+import os
 from pathlib import Path
 from PIL import Image, UnidentifiedImageError
 
-def process_and_save_image(image_bytes: bytes, output_path: Path, target_size: int, quality: int) -> None:
+IMAGE_FORMAT_EXTENSIONS = {
+    "jpeg": "jpg",
+    "webp": "webp",
+}
+
+# bump whenever the output for the same source and settings changes, so old names are not reused
+PIPELINE_VERSION = 3
+HASH_CHUNK_SIZE = 64 * 1024
+
+# resize() first shrinks by an integer factor with reduce() while the remaining scale stays above this gap
+REDUCING_GAP = 2.0
+
+def _choose_resampler(scale: float) -> Image.Resampling:
+    if scale <= 2:
+        return Image.Resampling.LANCZOS
+    if scale <= 4:
+        return Image.Resampling.BICUBIC
+    return Image.Resampling.BILINEAR
+
+def _crop_and_resize(image: Image.Image, box: tuple[int, int, int, int], size: int) -> Image.Image:
+    scale = (box[2] - box[0]) / size
+    if scale <= 1:
+        return image.crop(box)
+    # the filter only runs on what is left after reduce() has shrunk by int(scale / REDUCING_GAP)
+    remaining_scale = scale / max(1, int(scale / REDUCING_GAP))
+    return image.resize(
+        (size, size),
+        _choose_resampler(remaining_scale),
+        box=box,
+        reducing_gap=REDUCING_GAP if scale > REDUCING_GAP else None,
+    )
+
+def _save_image(image: Image.Image, output_path: Path, image_format: str, quality: int) -> None:
+    # write next to the target and rename so a concurrent upload of the same picture never sees a partial file
+    temp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
     try:
-        with Image.open(io.BytesIO(image_bytes)) as image:
-            if image.mode in ("RGBA", "P"):
-                image = image.convert("RGB")
-            width, height = image.size
-            short_side = min(width, height)
-            left = (width - short_side) / 2
-            top = (height - short_side) / 2
-            right = (width + short_side) / 2
-            bottom = (height + short_side) / 2
-            img_cropped = image.crop((left, top, right, bottom))
-            if img_cropped.width > target_size:
-                img_resized = img_cropped.resize((target_size, target_size), Image.Resampling.LANCZOS)
-            else:
-                img_resized = img_cropped
-            img_resized.save(
-                output_path,
+        if image_format == "webp":
+            image.save(temp_path, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(
+                temp_path,
                 format="JPEG",
                 quality=quality,
-                optimize=True,
+                optimize=False,
                 progressive=True,
             )
+        os.replace(temp_path, output_path)
+    except Exception:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+def content_hash(
+    image_path: Path,
+    target_size: int,
+    variant_sizes: list[int],
+    variant_formats: list[str],
+    quality: int,
+) -> str:
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    digest.update(repr((PIPELINE_VERSION, target_size, sorted(set(variant_sizes)), variant_formats, quality)).encode())
+    return digest.hexdigest()[:32]
+
+def _variant_sizes(variant_sizes: list[int], main_size: int) -> list[int]:
+    # the main file is always listed at its real width, even when the source is smaller than every configured size
+    return sorted({size for size in variant_sizes if size <= main_size} | {main_size}, reverse=True)
+
+def _variant_filename(stem: str, size: int, image_format: str, main_size: int) -> str:
+    # every format of the main width is named after the stem alone, so {stem}.jpg can be negotiated without its width
+    if size == main_size:
+        return f"{stem}.{IMAGE_FORMAT_EXTENSIONS[image_format]}"
+    return f"{stem}_{size}.{IMAGE_FORMAT_EXTENSIONS[image_format]}"
+
+def process_and_save_image(
+    image_path: Path,
+    output_dir: Path,
+    stem: str,
+    target_size: int,
+    variant_sizes: list[int],
+    variant_formats: list[str],
+    quality: int,
+) -> dict[str, dict[str, str]]:
+    try:
+        main_path = output_dir / f"{stem}.jpg"
+        if main_path.exists():
+            # the main file is written last, so its presence means every variant is already on disk
+            with Image.open(main_path) as existing_image:
+                main_size = existing_image.width
+            return {
+                image_format: {
+                    str(size): _variant_filename(stem, size, image_format, main_size)
+                    for size in _variant_sizes(variant_sizes, main_size)
+                }
+                for image_format in variant_formats
+            }
+        written_paths: list[Path] = []
+        try:
+            with Image.open(image_path) as image:
+                # jpeg only: let libjpeg decode at 1/2, 1/4 or 1/8 scale while both sides stay >= target_size
+                image.draft("RGB", (target_size, target_size))
+                width, height = image.size
+                short_side = min(width, height)
+                left = (width - short_side) // 2
+                top = (height - short_side) // 2
+                box = (left, top, left + short_side, top + short_side)
+                try:
+                    if image.mode in ("1", "P"):
+                        image = image.convert("RGB")
+                    img_resized = _crop_and_resize(image, box, min(short_side, target_size))
+                    if img_resized.mode != "RGB":
+                        img_resized = img_resized.convert("RGB")
+                except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+                    # the pixel data is only decoded here, a truncated or corrupt upload is a client error
+                    raise UnidentifiedImageError("Vui lòng chọn file ảnh")
+                # every variant is derived from the decoded crop, largest first so smaller ones reuse it
+                variants: dict[str, dict[str, str]] = {image_format: {} for image_format in variant_formats}
+                source = img_resized
+                for size in _variant_sizes(variant_sizes, img_resized.width):
+                    if size < source.width:
+                        source = _crop_and_resize(source, (0, 0, source.width, source.height), size)
+                    for image_format in variant_formats:
+                        filename = _variant_filename(stem, size, image_format, img_resized.width)
+                        if filename != main_path.name:
+                            _save_image(source, output_dir / filename, image_format, quality)
+                            written_paths.append(output_dir / filename)
+                        variants[image_format][str(size)] = filename
+                _save_image(img_resized, main_path, "jpeg", quality)
+                return variants
+        except Exception:
+            # another upload of the same picture may own these names; once its main file exists they are in use
+            if not main_path.exists():
+                for written_path in written_paths:
+                    written_path.unlink(missing_ok=True)
+            raise
     except UnidentifiedImageError:
         raise UnidentifiedImageError("Vui lòng chọn file ảnh")
     except IOError:
         raise IOError("Có lỗi khi lưu ảnh đã qua xử lý")
     except Exception:
         raise Exception("Đã xảy ra lỗi trong quá trình xử lý ảnh")
+
+def remove_image_files(output_dir: Path, stem: str, variant_filenames: dict[str, dict[str, str]]) -> None:
+    # only the names the pipeline produced, never a glob over the stem
+    for filenames in variant_filenames.values():
+        for filename in filenames.values():
+            (output_dir / filename).unlink(missing_ok=True)
+    (output_dir / f"{stem}.jpg").unlink(missing_ok=True)
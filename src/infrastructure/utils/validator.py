@@ -1,8 +1,23 @@
-import io
-import PIL.Image
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator
 from fastapi import File, Form, HTTPException, Query, UploadFile
 from starlette import status
+from starlette.concurrency import run_in_threadpool
 import email_validator
+import PIL.Image
+
+MAX_PICTURE_SIZE = 10 * 1024 * 1024
+PICTURE_CHUNK_SIZE = 64 * 1024
+# jpeg, png, gif
+IMAGE_SIGNATURES = (b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a")
+
+def is_webp(header: bytes) -> bool:
+    return header[:4] == b"RIFF" and header[8:12] == b"WEBP"
+
+def verify_image(path: Path) -> None:
+    with PIL.Image.open(path) as image:
+        image.verify()
 
 async def validate_user_id(id: int) -> int:
     if id <= 0:
@@ -34,18 +49,33 @@ async def validate_meal_price(price: int = Form(...)) -> int:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Giá món ăn phải lớn hơn 0")
     return price
 
-async def validate_picture(picture: UploadFile = File(...)) -> UploadFile:
-    try:
-        image = PIL.Image.open(io.BytesIO(await picture.read()))
-        image.verify()
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Vui lòng chọn file ảnh")
-    picture.file.seek(0, 2)
-    file_size = picture.file.tell()
-    if file_size > 10 * 1024 * 1024:
+async def validate_picture(picture: UploadFile = File(...)) -> AsyncIterator[Path]:
+    if picture.size is not None and picture.size > MAX_PICTURE_SIZE:
+        await picture.close()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Vui lòng chọn ảnh có kích thước dưới 10 MB")
-    picture.file.seek(0)
-    return picture
+    temp_file = tempfile.NamedTemporaryFile(delete=False)
+    temp_path = Path(temp_file.name)
+    try:
+        file_size = 0
+        while chunk := await picture.read(PICTURE_CHUNK_SIZE):
+            if file_size == 0 and not chunk.startswith(IMAGE_SIGNATURES) and not is_webp(chunk):
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Vui lòng chọn file ảnh")
+            file_size += len(chunk)
+            if file_size > MAX_PICTURE_SIZE:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Vui lòng chọn ảnh có kích thước dưới 10 MB")
+            await run_in_threadpool(temp_file.write, chunk)
+        temp_file.close()
+        if file_size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File ảnh rỗng")
+        try:
+            await run_in_threadpool(verify_image, temp_path)
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Vui lòng chọn file ảnh")
+        yield temp_path
+    finally:
+        temp_file.close()
+        temp_path.unlink(missing_ok=True)
+        await picture.close()
 
 async def validate_is_available_meal(is_available: bool | None = Query(None)) -> bool | None:
     if is_available not in [True, False, None]:
@@ -72,3 +102,8 @@ async def validate_size(size: int = Query(...)) -> int:
     if size < 1:
         raise HTTPException(status_code=400, detail="Kích thước trang phải lớn hơn hoặc bằng 1")
     return size
+
+async def validate_cursor(cursor: str | None = Query(None)) -> str | None:
+    if cursor is None or not cursor.strip():
+        return None
+    return cursor.strip()
@@ -1,13 +1,12 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketException
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from pydantic import ValidationError
 from fastapi import Request
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
 from fastapi_limiter import FastAPILimiter
 from concurrent.futures import ProcessPoolExecutor
 
@@ -19,23 +18,34 @@ from .infrastructure.config.rate_limiting import (
 )
 from .presentation.websocket import order_websocket
 from .presentation.api import order_api
-from .infrastructure.config.variables import UPLOAD_FOLDER
+from .infrastructure.config.variables import DB_INIT_MODE, UPLOAD_FOLDER
 from .presentation.api import meal_api
 from .presentation.api import manager_api
 from .presentation.api import user_api
+from .presentation.api import internal_api
 from .infrastructure.config.database import init_db
+from .infrastructure.config.migration import get_head_revision
 from .infrastructure.config.exception_handler import (
     process_http_exception,
     process_validation_error,
     process_global_exception,
     process_web_socket_exception
 )
-from .infrastructure.config.caching import REDIS_PREFIX, redis
+from .infrastructure.config.caching import REDIS_PREFIX, cache_backend, redis
+from .infrastructure.config.cryptography import password_hasher
+from .infrastructure.config.static_files import ImmutableStaticFiles
+from .infrastructure.config.broadcasting import broadcaster
+from .application.socket_manager.order_manager import order_manager
+from .application.socket_manager.staff_manager import staff_manager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await init_db()
-    FastAPICache.init(RedisBackend(redis), prefix=REDIS_PREFIX)
+    if DB_INIT_MODE == "create_all":
+        await init_db()
+    app.state.schema_head_revision = get_head_revision()
+    FastAPICache.init(cache_backend, prefix=REDIS_PREFIX)
+    app.state.cache_invalidation_task = asyncio.create_task(cache_backend.listen_for_invalidation())
+    app.state.broadcast_task = asyncio.create_task(broadcaster.listen())
     await FastAPILimiter.init(
         redis=redis,
         prefix=RATE_LIMITTING_CACHE_PREFIX,
@@ -44,9 +54,14 @@ async def lifespan(app: FastAPI):
     app.state.process_executor = ProcessPoolExecutor()
     app.state.redlock_connection_manager = redlock_connection_manager
     yield
+    app.state.cache_invalidation_task.cancel()
+    app.state.broadcast_task.cancel()
+    await order_manager.coalescer.close()
+    await staff_manager.coalescer.close()
     await redis.close()
     await FastAPILimiter.close()
     app.state.process_executor.shutdown(wait=True)
+    password_hasher.shutdown()
     for redlock_connection in app.state.redlock_connection_manager:
         await redlock_connection.close()
 
@@ -67,12 +82,13 @@ app.add_middleware(
 
 Path(UPLOAD_FOLDER).mkdir(parents=True, exist_ok=True)
 
-app.mount("/public/images", StaticFiles(directory=UPLOAD_FOLDER), name="images")
+app.mount("/public/images", ImmutableStaticFiles(directory=UPLOAD_FOLDER), name="images")
 
 app.include_router(user_api.router)
 app.include_router(manager_api.router)
 app.include_router(meal_api.router)
 app.include_router(order_api.router)
+app.include_router(internal_api.router)
 
 app.include_router(order_websocket.router)
 app.include_router(staff_websocket.router)
@@ -0,0 +1,4 @@
+from .infrastructure.config.migration import run_migrations
+
+if __name__ == "__main__":
+    run_migrations()
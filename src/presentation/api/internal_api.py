@@ -0,0 +1,58 @@
+import os
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette import status
+
+from ...application.socket_manager.order_manager import order_manager
+from ...application.socket_manager.staff_manager import staff_manager
+from ...infrastructure.config.database import get_pool_stats
+from ...infrastructure.config.migration import get_current_revision
+from ...domain.entity.user_entity import UserRole
+from ...application.schema.response.internal_response_schema import (
+    GetDatabasePoolStatsResponse,
+    GetReadinessResponse,
+    GetWebsocketStatsResponse,
+    WebsocketFanOutStatsResponse
+)
+from ...infrastructure.config.security import verify_access_token
+from ...infrastructure.utils.token_util import TokenClaims
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+@router.get(
+    path="/db-pool",
+    status_code=status.HTTP_200_OK,
+    response_model=GetDatabasePoolStatsResponse,
+    dependencies=[Depends(verify_access_token)]
+)
+async def get_database_pool_stats(claims: Annotated[TokenClaims, Depends(verify_access_token)]):
+    if claims.role != UserRole.MANAGER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập")
+    return GetDatabasePoolStatsResponse(**get_pool_stats())
+
+@router.get(
+    path="/ws-stats",
+    status_code=status.HTTP_200_OK,
+    response_model=GetWebsocketStatsResponse,
+    dependencies=[Depends(verify_access_token)]
+)
+async def get_websocket_stats(claims: Annotated[TokenClaims, Depends(verify_access_token)]):
+    if claims.role != UserRole.MANAGER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Không có quyền truy cập")
+    return GetWebsocketStatsResponse(
+        pid=os.getpid(),
+        order=WebsocketFanOutStatsResponse(**order_manager.stats()),
+        staff=WebsocketFanOutStatsResponse(**staff_manager.stats()),
+    )
+
+@router.get(
+    path="/ready",
+    status_code=status.HTTP_200_OK,
+    response_model=GetReadinessResponse,
+)
+async def get_readiness(request: Request):
+    head_revision = request.app.state.schema_head_revision
+    revision = await get_current_revision()
+    if revision is None or revision != head_revision:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Cơ sở dữ liệu chưa được cập nhật phiên bản mới nhất")
+    return GetReadinessResponse(ready=True, revision=revision, head_revision=head_revision)
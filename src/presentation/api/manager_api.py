@@ -10,7 +10,7 @@ from ...infrastructure.utils.validator import validate_email, validate_user_id
 from ...application.service.manager_service import ManagerService
 from ...application.schema.response.manager_response_schema import ActivateUserResponse, DeactivateUserResponse
 from ...infrastructure.config.dependencies import get_manager_service, get_user_service
-from ...infrastructure.config.security import verify_access_token
+from ...infrastructure.config.security import revoke_active_user, verify_access_token
 from ...infrastructure.utils.token_util import TokenClaims
 
 router = APIRouter(prefix="/manager", tags=["Manager"])
@@ -31,6 +31,7 @@ async def deactivate_user_by_id(
     background_tasks: BackgroundTasks,
 ):
     response = await manager_service.deactivate_user_by_id(role=claims.role, user_id=id, manager_id=claims.id)
+    await revoke_active_user(user_id=id)
     background_tasks.add_task(FastAPICacheExtended.clear, key=":".join([REDIS_PREFIX, RedisNamespace.USER, str(id)]))
     return response
 
@@ -52,6 +53,7 @@ async def deactivate_user_by_email(
 ):
     user_response = await user_service.get_user_by_email(email=email)
     deactivate_response = await manager_service.deactivate_user_by_email(role=claims.role, email=email, manager_id=claims.id)
+    await revoke_active_user(user_id=user_response.id)
     background_tasks.add_task(FastAPICacheExtended.clear, key=":".join([REDIS_PREFIX, RedisNamespace.USER, str(user_response.id)]))
     return deactivate_response
 
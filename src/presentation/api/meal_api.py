@@ -1,14 +1,15 @@
 from typing import Annotated
-from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile
+from pathlib import Path
+from fastapi import APIRouter, BackgroundTasks, Depends
 from fastapi_cache.coder import JsonCoder
 from fastapi_limiter.depends import RateLimiter
 from starlette import status
-from fastapi_cache.decorator import cache
 
 from ...infrastructure.config.rate_limiting import identifier_based_on_claims
-from ...infrastructure.config.caching import REDIS_PREFIX, FastAPICacheExtended, RedisNamespace
+from ...infrastructure.config.caching import REDIS_PREFIX, FastAPICacheExtended, RedisNamespace, cache
 from ...application.schema.request.meal_request_schema import UpdateMealDataRequest
 from ...infrastructure.utils.validator import (
+    validate_cursor,
     validate_is_available_meal,
     validate_meal_description,
     validate_meal_name,
@@ -89,7 +90,7 @@ async def create_meal(
     name: str = Depends(validate_meal_name),
     description: str = Depends(validate_meal_description),
     price: int = Depends(validate_meal_price),
-    picture: UploadFile = Depends(validate_picture),
+    picture: Path = Depends(validate_picture),
 ):
     response = await meal_service.create_meal(
         name=name,
@@ -135,7 +136,8 @@ async def get_meal_by_id(meal_service: Annotated[MealService, Depends(get_meal_s
             namespace,
             str(kwargs.get('page')),
             str(kwargs.get('size')),
-            'All' if kwargs.get('is_available') is None else str(kwargs.get('is_available'))
+            'All' if kwargs.get('is_available') is None else str(kwargs.get('is_available')),
+            str(kwargs.get('cursor') or '')
         ])
     )
 )
@@ -143,9 +145,10 @@ async def get_meals(
     meal_service: Annotated[MealService, Depends(get_meal_service)],
     size: int = Depends(validate_size),
     page: int = Depends(validate_page),
-    is_available: bool | None = Depends(validate_is_available_meal)
+    is_available: bool | None = Depends(validate_is_available_meal),
+    cursor: str | None = Depends(validate_cursor),
 ):
-    return await meal_service.get_meals(page=page, size=size, is_available=is_available)
+    return await meal_service.get_meals(page=page, size=size, is_available=is_available, cursor=cursor)
 
 @router.patch(
     path="/update-data/{id}",
@@ -187,7 +190,7 @@ async def update_meal_image(
     meal_service: Annotated[MealService, Depends(get_meal_service)],
     background_tasks: BackgroundTasks,
     id: int,
-    picture: UploadFile = Depends(validate_picture)
+    picture: Path = Depends(validate_picture)
 ):
     response = await meal_service.update_meal_image(id=id, picture=picture)
     background_tasks.add_task(FastAPICacheExtended.clear, namespace=RedisNamespace.MEAL_LIST)
@@ -2,13 +2,12 @@ from typing import Annotated
 from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from fastapi_limiter.depends import RateLimiter
 from starlette import status
-from fastapi_cache.decorator import cache
 from fastapi_cache import JsonCoder
 
 from ...application.socket_manager.staff_manager import staff_manager
 from ...infrastructure.config.rate_limiting import identifier_based_on_claims
-from ...infrastructure.config.caching import REDIS_PREFIX, FastAPICacheExtended, RedisNamespace
-from ...infrastructure.utils.validator import validate_is_order_responsible, validate_page, validate_size
+from ...infrastructure.config.caching import REDIS_PREFIX, FastAPICacheExtended, RedisNamespace, cache, invalidate, write_through
+from ...infrastructure.utils.validator import validate_cursor, validate_is_order_responsible, validate_page, validate_size
 from ...application.socket_manager.order_manager import order_manager
 from ...infrastructure.config.security import verify_access_token
 from ...infrastructure.utils.token_util import TokenClaims
@@ -27,6 +26,8 @@ from ...application.schema.response.order_response_schema import (
 
 router = APIRouter(prefix="/order", tags=["Order"])
 
+ORDER_CACHE_EXPIRE = 60 * 60
+
 @router.post(
     path="/create",
     status_code=status.HTTP_201_CREATED,
@@ -39,6 +40,13 @@ async def create_order(
     background_tasks: BackgroundTasks,
 ):
     response = await order_service.create_order(meals_ids=request.meals)
+    await write_through(
+        namespace=RedisNamespace.ORDER,
+        key=str(response.id),
+        value=GetOrderByIdResponse(**response.model_dump(), staff_id=None),
+        expire=ORDER_CACHE_EXPIRE,
+        version=response.updated_at.timestamp(),
+    )
     background_tasks.add_task(staff_manager.broadcast_new_order, order_id=response.id)
     return response
 
@@ -54,9 +62,11 @@ async def create_order(
 async def take_responsibility_for_order(
     claims: Annotated[TokenClaims, Depends(verify_access_token)],
     order_id: int,
-    order_service: Annotated[OrderService, Depends(get_order_service)]
+    order_service: Annotated[OrderService, Depends(get_order_service)],
 ):
-    return await order_service.take_responsibility_for_order(order_id=order_id, staff_id=claims.id)
+    response = await order_service.take_responsibility_for_order(order_id=order_id, staff_id=claims.id)
+    await invalidate(namespace=RedisNamespace.ORDER, key=str(order_id), expire=ORDER_CACHE_EXPIRE)
+    return response
 
 @router.put(
     path="/update-status",
@@ -74,6 +84,13 @@ async def update_order_status(
     background_tasks: BackgroundTasks
 ):
     response = await order_service.update_order_status(order_id=request.order_id, staff_id=claims.id, status=request.status)
+    await write_through(
+        namespace=RedisNamespace.ORDER,
+        key=str(response.id),
+        value=GetOrderByIdResponse(**response.model_dump()),
+        expire=ORDER_CACHE_EXPIRE,
+        version=response.updated_at.timestamp(),
+    )
     background_tasks.add_task(order_manager.broadcast, response.id, response.order_status)
     return response
 
@@ -111,6 +128,7 @@ async def handle_payment_return(
     background_tasks: BackgroundTasks,
 ):
     response = await order_service.handle_payment_return(query_params=dict(request.query_params))
+    await invalidate(namespace=RedisNamespace.ORDER, key=str(response.order_id), expire=ORDER_CACHE_EXPIRE)
     background_tasks.add_task(
         FastAPICacheExtended.clear,
         key=":".join([REDIS_PREFIX, RedisNamespace.PAYMENT_URL, str(response.order_id)])
@@ -123,6 +141,18 @@ async def handle_payment_return(
     response_model=GetOrderByIdResponse,
     dependencies=[Depends(RateLimiter(times=20, seconds=60))]
 )
+@cache(
+    expire=ORDER_CACHE_EXPIRE,
+    namespace=RedisNamespace.ORDER,
+    coder=JsonCoder,
+    generation_checked=True,
+    key_builder=lambda func, namespace="", *, request=None, response=None, args=(), kwargs={}: (
+        ":".join([
+            namespace,
+            str(kwargs.get("order_id"))
+        ])
+    )
+)
 async def get_order_by_id(order_id: int, order_service: Annotated[OrderService, Depends(get_order_service)]):
     return await order_service.get_order_by_id(order_id=order_id)
 
@@ -136,6 +166,12 @@ async def get_order_pagination(
     page: Annotated[int, Depends(validate_page)],
     size: Annotated[int, Depends(validate_size)],
     is_order_responsible: Annotated[bool, Depends(validate_is_order_responsible)],
+    cursor: Annotated[str | None, Depends(validate_cursor)],
     order_service: Annotated[OrderService, Depends(get_order_service)]
 ):
-    return await order_service.get_order_pagination(page=page, size=size, is_order_responsible=is_order_responsible)
+    return await order_service.get_order_pagination(
+        page=page,
+        size=size,
+        is_order_responsible=is_order_responsible,
+        cursor=cursor,
+    )
@@ -3,15 +3,14 @@ from fastapi import APIRouter, Depends, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi_cache import JsonCoder
 from starlette import status
-from fastapi_cache.decorator import cache
 from fastapi_limiter.depends import RateLimiter
 
 from ...application.background_task.send_email_verification_success import send_email_verification_success
 from ...application.background_task.send_email_reset_password_code import send_email_reset_password_code
 from ...application.background_task.send_email_reset_password_success import send_email_reset_password_success
 from ...infrastructure.config.rate_limiting import identifier_based_on_claims
-from ...infrastructure.config.caching import RedisNamespace
-from ...infrastructure.config.security import verify_access_token
+from ...infrastructure.config.caching import RedisNamespace, cache
+from ...infrastructure.config.security import revoke_active_user, verify_access_token
 from ...infrastructure.utils.token_util import TokenClaims
 from ...infrastructure.config.dependencies import get_user_service
 from ...application.schema.request.user_request_schema import ForgotPasswordRequest, GetAccessTokenRequest, LogoutUserRequest, RegisterUserRequest, ResetPasswordRequest
@@ -33,7 +32,8 @@ async def logout(
     user_service: Annotated[UserService, Depends(get_user_service)],
     request: LogoutUserRequest
 ):
-    await user_service.logout_user(refresh_token=request.refresh_token)
+    user_id = await user_service.logout_user(refresh_token=request.refresh_token)
+    await revoke_active_user(user_id=user_id)
 
 @router.post(
     path="/login",
@@ -8,8 +8,12 @@ router = APIRouter(prefix="/ws", tags=["Order Websocket"])
 @router.websocket(path="/order/{order_id}")
 async def listen_order_status(client_websocket: WebSocket, order_id: int):
     await order_manager.connect(client_websocket=client_websocket, order_id=order_id)
+    close_code = None
     try:
         while True:
-            await client_websocket.receive_json()
-    except WebSocketDisconnect:
-        order_manager.disconnect(client_websocket, order_id)
+            # liveness is checked by the server's protocol-level ping, inbound frames are ignored
+            await client_websocket.receive_text()
+    except WebSocketDisconnect as e:
+        close_code = e.code
+    finally:
+        order_manager.disconnect(client_websocket, order_id, close_code=close_code)
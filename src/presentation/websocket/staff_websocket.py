@@ -8,11 +8,16 @@ router = APIRouter(prefix="/ws", tags=["Staff"])
 
 @router.websocket(path="/staff/order")
 async def listen_new_order(client_websocket: WebSocket):
-    await staff_manager.handshake_connection(client_websocket=client_websocket)
+    # rejected clients are closed before the handshake completes
     claims: TokenClaims = await websocket_verify_access_token(client_websocket=client_websocket)
+    await staff_manager.handshake_connection(client_websocket=client_websocket)
     await staff_manager.connect(client_id=claims.id, client_websocket=client_websocket)
+    close_code = None
     try:
         while True:
-            await client_websocket.receive_json()
-    except WebSocketDisconnect:
-        staff_manager.disconnect(client_id=claims.id)
+            # liveness is checked by the server's protocol-level ping, inbound frames are ignored
+            await client_websocket.receive_text()
+    except WebSocketDisconnect as e:
+        close_code = e.code
+    finally:
+        staff_manager.disconnect(client_id=claims.id, client_websocket=client_websocket, close_code=close_code)
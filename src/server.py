@@ -0,0 +1,12 @@
+import sys
+from uvicorn.main import main
+
+from .infrastructure.config.variables import WEBSOCKET_PING_INTERVAL, WEBSOCKET_PING_TIMEOUT
+
+if __name__ == "__main__":
+    # uvicorn owns the websocket pings, flags given on the command line still take precedence
+    main([
+        "--ws-ping-interval", str(WEBSOCKET_PING_INTERVAL),
+        "--ws-ping-timeout", str(WEBSOCKET_PING_TIMEOUT),
+        *sys.argv[1:],
+    ])